@@ -6,25 +6,45 @@ Logs incoming requests and prediction completions in the requested format.
 
 Run:
   python3 ml_model\app.py
+  python3 ml_model\app.py --production --workers 4 --timeout 30
 """
+import argparse
+import gc
+import json
+import os
 from datetime import datetime
-from flask import Flask, request, jsonify
+
+from coalescer import COALESCE_ENABLED, build_coalescers, coalescer_stats, run_coalesced
+from startup_profiler import profile_phase
+
+with profile_phase("import flask", "import"):
+	from flask import Flask, Response, request, jsonify, stream_with_context
 
 app = Flask(__name__)
 
 try:
-	from prediction_service import (
-		health_check,
-		generate_quiz,
-		suggest_study,
-		recommend_career,
-		classify_question,
-		load_models,
-	)
+	with profile_phase("import prediction_service", "import"):
+		from prediction_service import (
+			HANDLERS,
+			health_check,
+			iter_classify_texts,
+			CLASSIFY_CHUNK_SIZE,
+			load_models,
+			get_question_columns,
+			get_near_duplicate_index,
+			run_batch,
+			run_command,
+			BATCH_COMMANDS,
+		)
+		from hybrid_generator import load_models as load_hybrid_models
 except Exception as e:
 	raise RuntimeError(f"Failed to import prediction_service: {e}")
 
 
+# Opt-in micro-batching of concurrent classify_question / recommend_career calls (ML_COALESCE=1)
+COALESCERS = build_coalescers(BATCH_COMMANDS) if COALESCE_ENABLED else {}
+
+
 def now_ts():
 	return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -75,6 +95,10 @@ def log_trained_used(command):
 		if "study_suggester" in models:
 			print("✅ Trained model used for Study Suggestion")
 			return
+	if command in ("get_prompt_guidance", "validate_questions"):
+		if "feature_classifier" in models:
+			print("✅ Trained model used for LLM question guidance")
+			return
 	# Generic daily-task or other analyses
 	if command in ("daily_task", "process_daily_task"):
 		if any(k in models for k in ("random_forest", "study_suggester")):
@@ -85,33 +109,57 @@ def log_trained_used(command):
 	print("⚠️  No trained model was detected for this command; heuristics used instead")
 
 
+def stream_classifications(data):
+	"""Stream classify_questions results as NDJSON, one {"index", "category", "confidence"} per line."""
+	texts = data.get("texts", [])
+	if not isinstance(texts, list):
+		return jsonify({"success": False, "error": "texts must be a list of strings"}), 400
+	chunk_size = int(data.get("chunk_size") or CLASSIFY_CHUNK_SIZE)
+
+	def generate():
+		try:
+			for i, result in enumerate(iter_classify_texts(texts, chunk_size)):
+				yield json.dumps({"index": i, **result}) + "\n"
+		except Exception as e:
+			yield json.dumps({"success": False, "error": str(e)}) + "\n"
+			return
+		print(f"[{now_ts()}] ML Prediction Complete")
+		print(f"  ✓ Streamed {len(texts)} classifications")
+
+	return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 @app.route("/health", methods=["GET"])
 def health():
 	res = health_check({})
 	return jsonify({"success": True, "result": res})
 
 
+@app.route("/stats", methods=["GET"])
+def stats():
+	return jsonify({"success": True, "result": {"coalescing": coalescer_stats(COALESCERS)}})
+
+
 @app.route("/predict", methods=["POST"])
 def predict():
 	payload = request.get_json(force=True)
 	command = payload.get("command")
 	data = payload.get("data", {})
 
-	handlers = {
-		"generate_quiz": generate_quiz,
-		"suggest_study": suggest_study,
-		"recommend_career": recommend_career,
-		"classify_question": classify_question,
-		"health_check": health_check,
-	}
-
 	log_request(command, data)
 
-	if command not in handlers:
+	if command not in HANDLERS:
 		return jsonify({"success": False, "error": f"Unknown command: {command}"}), 400
 
+	if command == "classify_questions" and isinstance(data, dict) and data.get("stream"):
+		return stream_classifications(data)
+
+	compute = HANDLERS[command]
+	if command in COALESCERS:
+		compute = lambda d: run_coalesced(COALESCERS, BATCH_COMMANDS, command, d)
+
 	try:
-		result = handlers[command](data)
+		result = run_command(command, data, compute)
 	except Exception as e:
 		return jsonify({"success": False, "error": str(e)}), 500
 
@@ -131,8 +179,88 @@ def predict():
 	return jsonify({"success": True, "result": result})
 
 
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+	payload = request.get_json(force=True)
+	requests = payload.get("requests") if isinstance(payload, dict) else None
+
+	if not isinstance(requests, list):
+		return jsonify({"success": False, "error": "Expected a JSON body of the form {\"requests\": [...]}"}), 400
+
+	print(f"[{now_ts()}] ML Batch Request")
+	print(f"  Commands: {len(requests)}")
+
+	try:
+		results = run_batch(requests)
+	except Exception as e:
+		return jsonify({"success": False, "error": str(e)}), 500
+
+	failed = sum(1 for r in results if not r.get("success"))
+	print(f"[{now_ts()}] ML Batch Complete")
+	print(f"  ✓ {len(results) - failed} succeeded, {failed} failed")
+
+	return jsonify({"success": True, "result": results})
+
+
+def warm_up():
+	"""Load every model and build the question scoring and near-duplicate tables in the current process."""
+	load_models(warm=["all"])
+	load_hybrid_models()
+	get_question_columns()
+	get_near_duplicate_index()
+	# Move everything allocated so far out of the GC's tracked generations, so
+	# collections in forked workers don't write to (and un-share) these pages.
+	gc.freeze()
+
+
+def run_production(host, port, workers, timeout, threads=1):
+	"""Serve with gunicorn using pre-forked workers.
+
+	Models and QUESTION_BANK tables are loaded once in the master before
+	forking, so every worker shares them copy-on-write. Workers that take
+	longer than `timeout` seconds on a request are killed and replaced.
+	"""
+	try:
+		from gunicorn.app.base import BaseApplication
+	except ImportError:
+		raise SystemExit("gunicorn is required for --production (pip install gunicorn); it is not available on Windows")
+
+	options = {
+		"bind": f"{host}:{port}",
+		"workers": workers,
+		"threads": threads,
+		"timeout": timeout,
+		"graceful_timeout": timeout,
+		"preload_app": True,
+	}
+
+	class PreforkApplication(BaseApplication):
+		def load_config(self):
+			for key, value in options.items():
+				self.cfg.set(key, value)
+
+		def load(self):
+			return app
+
+	print(f"[{now_ts()}] Preloading models before forking {workers} workers")
+	warm_up()
+	PreforkApplication().run()
+
+
 if __name__ == "__main__":
-	# Bind to localhost:5001 as requested
-	app.run(host="127.0.0.1", port=5001)
+	parser = argparse.ArgumentParser(description="CareerQuest ML HTTP service")
+	parser.add_argument("--host", default=os.environ.get("ML_HOST", "127.0.0.1"))
+	parser.add_argument("--port", type=int, default=int(os.environ.get("ML_PORT", "5001")))
+	parser.add_argument("--production", action="store_true", help="serve with pre-forked gunicorn workers")
+	parser.add_argument("--workers", type=int, default=int(os.environ.get("ML_WORKERS", os.cpu_count() or 1)))
+	parser.add_argument("--threads", type=int, default=int(os.environ.get("ML_THREADS", "1")))
+	parser.add_argument("--timeout", type=int, default=int(os.environ.get("ML_TIMEOUT", "30")), help="per-request timeout in seconds")
+	args = parser.parse_args()
+
+	if args.production:
+		run_production(args.host, args.port, args.workers, args.timeout, args.threads)
+	else:
+		# Bind to localhost:5001 as requested
+		app.run(host=args.host, port=args.port)
 
 
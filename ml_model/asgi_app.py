@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Async (ASGI) ML service.
+
+Exposes the same routes as app.py (`/predict`, `/predict/batch`, `/health`)
+on an asyncio event loop. CPU-bound commands run in a bounded process (or
+thread) pool, so slow predictions never stall health checks, and request
+logging goes through a background thread instead of blocking the loop.
+`/stats` (and the `queue` field of `/health`) report queue depth and
+in-flight counts, plus batch-size histograms when coalescing is enabled.
+Coalesced requests count against the same queue limit while they wait,
+and their batches take pool slots like any other pool work.
+
+Run:
+  python3 ml_model/asgi_app.py --port 5001 --pool-size 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from coalescer import (
+	COALESCE_ENABLED,
+	COALESCE_MAX_BATCH,
+	COALESCE_MAX_WAIT_MS,
+	build_coalescers,
+	coalescer_stats,
+	submit_request,
+)
+from hybrid_generator import load_models as load_hybrid_models
+from prediction_service import (
+	BATCH_COMMANDS,
+	HANDLERS,
+	cache_lookup,
+	cache_store,
+	get_near_duplicate_index,
+	get_question_columns,
+	handle_request,
+	health_check,
+	load_models,
+	run_batch,
+)
+
+# Commands that spend their time in sklearn / NumPy and go to the worker pool
+CPU_BOUND_COMMANDS = {"generate_quiz", "classify_question", "classify_questions", "validate_questions"}
+
+POOL_KIND = os.environ.get("ML_ASGI_POOL", "process")
+POOL_SIZE = int(os.environ.get("ML_ASGI_POOL_SIZE", os.cpu_count() or 1))
+# Requests allowed to wait for a pool slot before new ones get a 503
+MAX_QUEUE = int(os.environ.get("ML_ASGI_MAX_QUEUE", "64"))
+
+log = logging.getLogger("careerquest.ml.asgi")
+
+
+def _init_worker():
+	"""Warm models in each pool process before it takes requests."""
+	load_models(warm=["all"])
+	load_hybrid_models()
+	get_question_columns()
+	get_near_duplicate_index()
+
+
+def _run_request(request):
+	return handle_request(request)
+
+
+def _run_batch(requests):
+	return run_batch(requests)
+
+
+class PoolDispatcher:
+	"""Bounded executor front-end that tracks queued and in-flight work."""
+
+	def __init__(self, kind=POOL_KIND, size=POOL_SIZE, max_queue=MAX_QUEUE):
+		self.kind = kind
+		self.size = size
+		self.max_queue = max_queue
+		self.queued = 0
+		self.coalesce_waiting = 0
+		self.in_flight = 0
+		self.completed = 0
+		self.rejected = 0
+		self.executor = None
+		self.loop = None
+		self._slots = None
+
+	def start(self):
+		if self.kind == "thread":
+			_init_worker()
+			self.executor = ThreadPoolExecutor(max_workers=self.size)
+		else:
+			# spawn: never fork a process that already runs the log thread
+			self.executor = ProcessPoolExecutor(
+				max_workers=self.size,
+				mp_context=multiprocessing.get_context("spawn"),
+				initializer=_init_worker,
+			)
+		self._slots = asyncio.Semaphore(self.size)
+		self.loop = asyncio.get_running_loop()
+
+	def shutdown(self):
+		if self.executor is not None:
+			self.executor.shutdown(wait=False, cancel_futures=True)
+
+	def stats(self):
+		return {
+			"pool": self.kind,
+			"pool_size": self.size,
+			"queue_depth": self.queued,
+			"coalesce_waiting": self.coalesce_waiting,
+			"in_flight": self.in_flight,
+			"completed": self.completed,
+			"rejected": self.rejected,
+			"max_queue": self.max_queue,
+		}
+
+	def _check_capacity(self):
+		if self.queued + self.coalesce_waiting >= self.max_queue:
+			self.rejected += 1
+			raise OverflowError("ML service is overloaded, try again later")
+
+	def admit(self):
+		"""Count one request waiting in a micro-batcher against the queue limit; raises OverflowError when full."""
+		self._check_capacity()
+		self.coalesce_waiting += 1
+
+	def release(self):
+		self.coalesce_waiting -= 1
+
+	async def submit(self, fn, *args):
+		"""Run fn(*args) in the pool; raises OverflowError when the queue is full."""
+		self._check_capacity()
+		return await self._execute(fn, *args)
+
+	def run_threadsafe(self, fn, *args):
+		"""Run fn(*args) in the pool from a thread outside the event loop and wait for the result.
+
+		Used for coalesced batches, whose requests were already admitted; the
+		batch still waits for a pool slot and is counted in the pool stats.
+		"""
+		return asyncio.run_coroutine_threadsafe(self._execute(fn, *args), self.loop).result()
+
+	async def _execute(self, fn, *args):
+		self.queued += 1
+		try:
+			await self._slots.acquire()
+		finally:
+			self.queued -= 1
+
+		self.in_flight += 1
+		try:
+			loop = asyncio.get_running_loop()
+			return await loop.run_in_executor(self.executor, fn, *args)
+		finally:
+			self.in_flight -= 1
+			self.completed += 1
+			self._slots.release()
+
+
+dispatcher = PoolDispatcher()
+coalesce = {"enabled": COALESCE_ENABLED, "max_batch": COALESCE_MAX_BATCH, "max_wait_ms": COALESCE_MAX_WAIT_MS}
+coalescers = {}
+_log_listener = None
+
+
+def start_coalescing():
+	"""Build the micro-batchers; each coalesced batch runs as one call in the worker pool."""
+	global coalescers
+	if coalesce["enabled"]:
+		coalescers = build_coalescers(
+			BATCH_COMMANDS,
+			coalesce["max_batch"],
+			coalesce["max_wait_ms"],
+			runner=dispatcher.run_threadsafe,
+		)
+
+
+async def run_coalesced(command, data):
+	"""Queue one request in its command's micro-batcher; it counts against the pool's queue limit until answered."""
+	dispatcher.admit()
+	try:
+		return await asyncio.wrap_future(submit_request(coalescers, BATCH_COMMANDS, command, data))
+	finally:
+		dispatcher.release()
+
+
+def service_stats():
+	return {**dispatcher.stats(), "coalescing": coalescer_stats(coalescers)}
+
+
+def start_logging():
+	"""Send log records through a queue so the event loop never blocks on stdout."""
+	global _log_listener
+	records = queue.SimpleQueue()
+	stream = logging.StreamHandler(sys.stdout)
+	stream.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+	_log_listener = logging.handlers.QueueListener(records, stream)
+	_log_listener.start()
+	log.addHandler(logging.handlers.QueueHandler(records))
+	log.setLevel(logging.INFO)
+	log.propagate = False
+
+
+async def read_json(receive):
+	body = b""
+	more_body = True
+	while more_body:
+		message = await receive()
+		body += message.get("body", b"")
+		more_body = message.get("more_body", False)
+	return json.loads(body or b"{}")
+
+
+async def send_json(send, status, payload):
+	body = json.dumps(payload).encode()
+	await send({
+		"type": "http.response.start",
+		"status": status,
+		"headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+	})
+	await send({"type": "http.response.body", "body": body})
+
+
+async def handle_health():
+	result = health_check({})
+	result["queue"] = service_stats()
+	return 200, {"success": True, "result": result}
+
+
+async def handle_predict(payload):
+	command = payload.get("command") if isinstance(payload, dict) else None
+	log.info("ML Service Request | Command: %s", command)
+
+	if command not in HANDLERS:
+		return 400, {"success": False, "error": f"Unknown command: {command}"}
+
+	request = {"command": command, "data": payload.get("data", {})}
+	hit, result = cache_lookup(command, request["data"])
+	if hit:
+		log.info("ML Prediction Complete | Command: %s | cache hit", command)
+		return 200, {"success": True, "result": result}
+
+	if command in coalescers and isinstance(request["data"], dict):
+		response = await run_coalesced(command, request["data"])
+	elif command in CPU_BOUND_COMMANDS:
+		response = await dispatcher.submit(_run_request, request)
+	else:
+		response = await asyncio.to_thread(handle_request, request)
+
+	if response["success"]:
+		cache_store(command, request["data"], response["result"])
+	log.info("ML Prediction Complete | Command: %s | success=%s", command, response["success"])
+	return (200 if response["success"] else 500), response
+
+
+async def handle_predict_batch(payload):
+	requests = payload.get("requests") if isinstance(payload, dict) else None
+	if not isinstance(requests, list):
+		return 400, {"success": False, "error": "Expected a JSON body of the form {\"requests\": [...]}"}
+
+	log.info("ML Batch Request | Commands: %d", len(requests))
+	results = await dispatcher.submit(_run_batch, requests)
+	return 200, {"success": True, "result": results}
+
+
+async def lifespan(receive, send):
+	while True:
+		message = await receive()
+		if message["type"] == "lifespan.startup":
+			try:
+				dispatcher.start()
+				start_coalescing()
+				start_logging()
+			except Exception as e:
+				await send({"type": "lifespan.startup.failed", "message": str(e)})
+				return
+			await send({"type": "lifespan.startup.complete"})
+		elif message["type"] == "lifespan.shutdown":
+			dispatcher.shutdown()
+			if _log_listener is not None:
+				_log_listener.stop()
+			await send({"type": "lifespan.shutdown.complete"})
+			return
+
+
+async def app(scope, receive, send):
+	"""ASGI entry point."""
+	if scope["type"] == "lifespan":
+		await lifespan(receive, send)
+		return
+	if scope["type"] != "http":
+		return
+
+	method, path = scope["method"], scope["path"]
+	try:
+		if path == "/health" and method == "GET":
+			status, payload = await handle_health()
+		elif path == "/stats" and method == "GET":
+			status, payload = 200, {"success": True, "result": service_stats()}
+		elif path == "/predict" and method == "POST":
+			status, payload = await handle_predict(await read_json(receive))
+		elif path == "/predict/batch" and method == "POST":
+			status, payload = await handle_predict_batch(await read_json(receive))
+		else:
+			status, payload = 404, {"success": False, "error": f"Not found: {method} {path}"}
+	except json.JSONDecodeError as e:
+		status, payload = 400, {"success": False, "error": f"Invalid JSON: {e}"}
+	except OverflowError as e:
+		status, payload = 503, {"success": False, "error": str(e)}
+	except Exception as e:
+		status, payload = 500, {"success": False, "error": str(e)}
+
+	await send_json(send, status, payload)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="CareerQuest ML ASGI service")
+	parser.add_argument("--host", default=os.environ.get("ML_HOST", "127.0.0.1"))
+	parser.add_argument("--port", type=int, default=int(os.environ.get("ML_PORT", "5001")))
+	parser.add_argument("--pool", choices=["process", "thread"], default=POOL_KIND)
+	parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+	parser.add_argument("--max-queue", type=int, default=MAX_QUEUE)
+	parser.add_argument("--coalesce", action="store_true", default=COALESCE_ENABLED, help="micro-batch classify_question / recommend_career")
+	parser.add_argument("--coalesce-max-batch", type=int, default=COALESCE_MAX_BATCH)
+	parser.add_argument("--coalesce-max-wait-ms", type=float, default=COALESCE_MAX_WAIT_MS)
+	args = parser.parse_args()
+
+	try:
+		import uvicorn
+	except ImportError:
+		raise SystemExit("uvicorn is required to run the ASGI service (pip install uvicorn)")
+
+	dispatcher = PoolDispatcher(args.pool, args.pool_size, args.max_queue)
+	coalesce.update(enabled=args.coalesce, max_batch=args.coalesce_max_batch, max_wait_ms=args.coalesce_max_wait_ms)
+	uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Micro-batching request coalescer for CareerQuest ML services
+Concurrent single-item requests for the same command are collected for up to
+a few milliseconds (or until a batch is full) and run as one vectorized call,
+with each result handed back to the caller that submitted it
+"""
+
+import os
+import sys
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Opt-in: ML_COALESCE=1 enables coalescing in app.py / asgi_app.py
+COALESCE_ENABLED = os.environ.get("ML_COALESCE", "0").lower() in ("1", "true", "yes")
+COALESCE_MAX_BATCH = int(os.environ.get("ML_COALESCE_MAX_BATCH", "32"))
+COALESCE_MAX_WAIT_MS = float(os.environ.get("ML_COALESCE_MAX_WAIT_MS", "5"))
+
+
+def histogram_bucket(size):
+    """Power-of-two upper bound used as the batch-size histogram bucket"""
+    bound = 1
+    while bound < size:
+        bound *= 2
+    return bound
+
+
+class MicroBatcher:
+    """Coalesce items submitted from many threads into calls of `batch_fn(items) -> results`."""
+
+    def __init__(self, name, batch_fn, max_batch=COALESCE_MAX_BATCH, max_wait_ms=COALESCE_MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.batches = 0
+        self.items = 0
+        self.histogram = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so (re)start the collector in each worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            threading.Thread(target=self._run, name=f"coalescer-{self.name}", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, item):
+        """Queue one item; returns a Future resolved with its result"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._record(len(batch))
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Isolate the failing item instead of failing everyone in the batch
+            print(f"Coalesced {self.name} batch failed ({e}); retrying items individually", file=sys.stderr)
+            for entry in batch:
+                self._dispatch([entry])
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _record(self, size):
+        bucket = histogram_bucket(size)
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "batch_size_histogram": {f"le_{bound}": count for bound, count in sorted(self.histogram.items())},
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+def build_coalescers(batch_commands, max_batch=COALESCE_MAX_BATCH, max_wait_ms=COALESCE_MAX_WAIT_MS, runner=None):
+    """Create one MicroBatcher per command in `batch_commands` (command -> (extract, batch_fn)).
+
+    `runner(batch_fn, items)` lets a server run each batch somewhere else,
+    e.g. in a process pool; by default the batch runs on the collector thread.
+    """
+    coalescers = {}
+    for command, (_, batch_fn) in batch_commands.items():
+        if runner is not None:
+            batch_fn = (lambda fn: lambda items: runner(fn, items))(batch_fn)
+        coalescers[command] = MicroBatcher(command, batch_fn, max_batch, max_wait_ms)
+    return coalescers
+
+
+def submit_request(coalescers, batch_commands, command, data):
+    """Submit one request to its command's batcher.
+
+    Returns a Future resolving to a {"success", "result"|"error"} response, or
+    None when the command is not coalesced.
+    """
+    if command not in coalescers or not isinstance(data, dict):
+        return None
+
+    response = Future()
+    extract, _ = batch_commands[command]
+    try:
+        item = extract(data)
+    except ValueError as e:
+        response.set_result({"success": False, "error": str(e)})
+        return response
+
+    def resolve(future):
+        try:
+            response.set_result({"success": True, "result": future.result()})
+        except Exception as e:
+            response.set_result({"success": False, "error": str(e)})
+
+    coalescers[command].submit(item).add_done_callback(resolve)
+    return response
+
+
+def run_coalesced(coalescers, batch_commands, command, data, timeout=None):
+    """Run one request through its command's batcher and wait for the result (raises on failure)"""
+    extract, _ = batch_commands[command]
+    return coalescers[command].submit(extract(data)).result(timeout)
+
+
+def coalescer_stats(coalescers):
+    return {command: batcher.stats() for command, batcher in coalescers.items()}
@@ -2,28 +2,53 @@
 #!/usr/bin/env python3
 import sys
 import json
-import pickle
 import numpy as np
 from pathlib import Path
 
-SAVED_MODELS_DIR = Path("ml_model/saved_models")
+from model_registry import shared_registry
+from near_duplicate import NearDuplicateIndex, minhash_many, shingles
+from question_bank import shared_source
+from question_index import build_question_index
+from question_store import assign_question_ids, question_id
+
+SAVED_MODELS_DIR = Path(__file__).parent / "saved_models"
+
+MODEL_FILES = {
+    "feature_classifier": "question_feature_classifier.pkl",
+    "category_encoder": "category_encoder_v2.pkl",
+    "difficulty_encoder": "difficulty_encoder_v2.pkl",
+    "templates": "question_templates.json",
+}
+
+# Tables derived from question_templates.json, rebuilt when the registry reloads it
+_template_tables = {"source": None, "tables": None}
+
+def build_template_tables(templates):
+    """Assign template question ids and build the inverted index and prompt-guidance table over them"""
+    questions = templates["questions"]
+    assign_question_ids(questions)
+    index = build_question_index(questions)
+    return {
+        "template_index": index,
+        "guidance": build_guidance_table(questions, index),
+    }
+
+def get_template_tables(templates):
+    if _template_tables["source"] is not templates:
+        _template_tables["tables"] = build_template_tables(templates)
+        _template_tables["source"] = templates
+    return _template_tables["tables"]
 
 def load_models():
-    """Load all ML models"""
-    models = {}
+    """Load all ML models (cached in the shared registry, reloaded when their files change)"""
+    registry = shared_registry(SAVED_MODELS_DIR, MODEL_FILES)
     try:
-        with open(SAVED_MODELS_DIR / "question_feature_classifier.pkl", "rb") as f:
-            models["feature_classifier"] = pickle.load(f)
-        with open(SAVED_MODELS_DIR / "category_encoder_v2.pkl", "rb") as f:
-            models["category_encoder"] = pickle.load(f)
-        with open(SAVED_MODELS_DIR / "difficulty_encoder_v2.pkl", "rb") as f:
-            models["difficulty_encoder"] = pickle.load(f)
-        with open(SAVED_MODELS_DIR / "question_templates.json", "r") as f:
-            models["templates"] = json.load(f)
-        return models
-    except Exception as e:
+        models = {key: registry[key] for key in MODEL_FILES}
+    except KeyError as e:
         print(f"Error loading models: {e}", file=sys.stderr)
         return None
+    models.update(get_template_tables(models["templates"]))
+    return models
 
 def extract_question_features(question_data):
     """Extract features from a question for classification"""
@@ -37,109 +62,304 @@ def extract_question_features(question_data):
         len(question_data.get("topic_keywords", []))  # num_keywords
     ]
 
-def generate_ml_guided_prompt(category, difficulty, career_path=None):
-    """Generate prompt based on ML model predictions"""
-    models = load_models()
-    if not models:
-        return None
+# Example questions per guidance entry, chosen to cover the group's feature spread
+GUIDANCE_EXAMPLES = 2
+DEFAULT_WORD_COUNT_RANGE = [8, 15]
+
+def template_feature_matrix(questions):
+    """Numeric template "features" as a standardized matrix; returns (names, raw, standardized, has_features).
     
-    # Find similar questions from templates
-    templates = models["templates"]["questions"]
-    category_questions = [q for q in templates if q["category"] == category]
-    difficulty_questions = [q for q in category_questions if q["difficulty"] == difficulty]
+    Rows without any numeric feature are flagged False in has_features; they
+    take no part in the column statistics and their values are placeholders.
+    """
+    names = sorted({
+        name for q in questions for name, value in q.get("features", {}).items()
+        if isinstance(value, (int, float))
+    })
+    raw = np.array([
+        [value if isinstance(value, (int, float)) else np.nan for value in (q.get("features", {}).get(name, np.nan) for name in names)]
+        for q in questions
+    ], dtype=float).reshape(len(questions), len(names))
     
-    if not difficulty_questions:
-        difficulty_questions = category_questions[:3] if category_questions else templates[:3]
+    has_features = ~np.isnan(raw).all(axis=1) if names else np.zeros(len(questions), dtype=bool)
     
-    # Create example-based prompt
-    examples = difficulty_questions[:2]
+    if has_features.any():
+        # Every column has a value in some featured row; other missing values
+        # take the column mean so they do not pull distances around
+        means = np.nanmean(raw[has_features], axis=0)
+        raw = np.where(np.isnan(raw), means, raw)
+        spread = raw[has_features].std(axis=0)
+        standardized = (raw - means) / np.where(spread > 0, spread, 1.0)
+    else:
+        standardized = raw
+    return names, raw, standardized, has_features
+
+def select_representatives(points, k):
+    """Pick up to k rows: the one nearest the centroid, then farthest-point picks for diversity"""
+    if len(points) == 0:
+        return []
+    centroid = points.mean(axis=0)
+    chosen = [int(np.argmin(((points - centroid) ** 2).sum(axis=1)))]
+    nearest = ((points - points[chosen[0]]) ** 2).sum(axis=1)
+    while len(chosen) < min(k, len(points)):
+        candidate = int(np.argmax(nearest))
+        if nearest[candidate] == 0:
+            break  # Only duplicates of chosen rows are left
+        chosen.append(candidate)
+        nearest = np.minimum(nearest, ((points - points[candidate]) ** 2).sum(axis=1))
+    return chosen
+
+def build_guidance_entry(questions, positions, names, raw, standardized, has_features):
+    """Prompt guidance for one group of template positions.
+    
+    Examples and the centroid come from templates with numeric features;
+    featureless templates only fill example slots that would otherwise be empty.
+    """
+    positions = np.asarray(positions, dtype=np.intp)
+    featured = positions[has_features[positions]]
+    examples = [questions[featured[i]] for i in select_representatives(standardized[featured], GUIDANCE_EXAMPLES)]
+    examples += [questions[i] for i in positions[~has_features[positions]][:GUIDANCE_EXAMPLES - len(examples)]]
+    centroid = {name: round(float(value), 4) for name, value in zip(names, raw[featured].mean(axis=0))} if len(featured) else {}
+    
+    word_counts = [len(questions[i].get("question", "").split()) for i in positions]
+    word_count_range = (
+        [int(np.percentile(word_counts, 10)), int(np.ceil(np.percentile(word_counts, 90)))]
+        if word_counts else DEFAULT_WORD_COUNT_RANGE
+    )
     
     return {
-        "category": category,
-        "difficulty": difficulty,
         "examples": examples,
+        "feature_centroid": centroid,
+        "sample_size": len(positions),
         "style_guide": {
-            "word_count_range": [8, 15],
-            "complexity": examples[0]["features"]["complexity_score"] if examples else 0.5,
-            "requires_code": examples[0]["features"]["has_code_term"] if examples else 1
+            "word_count_range": word_count_range,
+            "complexity": centroid.get("complexity_score", 0.5),
+            "requires_code": int(centroid.get("has_code_term", 1) >= 0.5)
         }
     }
 
-def validate_generated_question(question, expected_category, expected_difficulty):
-    """Validate a generated question against learned patterns"""
+def build_guidance_table(questions, index):
+    """Precompute guidance for every (category, difficulty) in the templates.
+    
+    (category, None) entries cover unknown difficulties of a known category and
+    (None, None) covers unknown categories, like the old fallbacks did.
+    """
+    names, raw, standardized, has_features = template_feature_matrix(questions)
+    groups = dict(index["category_difficulty"])
+    groups.update({(category, None): positions for category, positions in index["category"].items()})
+    groups[(None, None)] = index["all"]
+    return {key: build_guidance_entry(questions, positions, names, raw, standardized, has_features) for key, positions in groups.items()}
+
+def generate_ml_guided_prompt(category, difficulty, career_path=None):
+    """Return the precomputed prompt guidance for (category, difficulty)"""
     models = load_models()
     if not models:
-        return True  # Allow if models not loaded
+        return None
     
+    table = models["guidance"]
+    entry = table.get((category, difficulty)) or table.get((category, None)) or table[(None, None)]
+    return {"category": category, "difficulty": difficulty, **entry}
+
+# Rejection reasons reported by validate_questions_batch, in check order
+REJECTION_CHECKS = (
+    "category_mismatch",
+    "question_too_short",
+    "wrong_option_count",
+    "missing_correct_answer",
+    "explanation_too_short",
+    "near_duplicate",
+)
+
+def build_feature_matrix(questions):
+    """Stack extract_question_features rows; returns (matrix, row ok mask).
+    
+    Rows whose features cannot be extracted or converted to numbers are
+    zero-filled and flagged so the caller can skip the model check for them.
+    """
     try:
-        features = extract_question_features(question)
-        X = np.array([features])
-        
-        # Predict category
-        predicted_cat = models["category_encoder"].inverse_transform(
-            models["feature_classifier"].predict(X)
-        )[0]
-        
-        # Check if category matches
-        category_match = predicted_cat == expected_category
-        
-        # Check basic quality criteria
-        has_question = len(question.get("question", "")) > 10
-        has_options = len(question.get("options", [])) == 4
-        has_answer = "correctAnswer" in question
-        has_explanation = len(question.get("explanation", "")) > 20
-        
-        is_valid = category_match and has_question and has_options and has_answer and has_explanation
+        rows = [extract_question_features(q) for q in questions]
+        return np.array(rows, dtype=float).reshape(len(rows), -1), np.ones(len(rows), dtype=bool)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    
+    X = np.zeros((len(questions), len(extract_question_features({}))))
+    ok = np.ones(len(questions), dtype=bool)
+    for i, q in enumerate(questions):
+        try:
+            X[i] = np.array(extract_question_features(q), dtype=float)
+        except (AttributeError, TypeError, ValueError):
+            ok[i] = False
+    return X, ok
+
+def field_length(question, field, kind):
+    """Length of a question field, or 0 when it is missing or not of type `kind`"""
+    value = question.get(field)
+    return len(value) if isinstance(value, kind) else 0
+
+def find_near_duplicates(questions):
+    """For each question, the id of a bank question it paraphrases (or of an
+    earlier question in the same batch), else None.
+    
+    Each check is an LSH bucket lookup, so the cost per question does not grow
+    with the bank.
+    """
+    bank_index = shared_source().near_duplicate_index()
+    batch_index = NearDuplicateIndex(bank_index.threshold)
+    texts = [q.get("question") if isinstance(q.get("question"), str) else "" for q in questions]
+    shingle_sets = [shingles(text) for text in texts]
+    
+    duplicate_of = []
+    for text, shingle_set, signature in zip(texts, shingle_sets, minhash_many(shingle_sets)):
+        matches = bank_index.query(shingle_set=shingle_set, signature=signature) or batch_index.query(shingle_set=shingle_set, signature=signature)
+        duplicate_of.append(matches[0][0] if matches else None)
+        batch_index.add(question_id(text), shingle_set=shingle_set, signature=signature)
+    return duplicate_of
+
+def validate_questions_batch(questions, expected_category, expected_difficulty):
+    """Validate many generated questions at once against learned patterns.
+    
+    Applies the structural and near-duplicate checks as boolean masks, then
+    builds one feature matrix and predicts every category in a single call.
+    Only the category check needs the models; it is skipped when they are
+    unavailable or fail. Returns (valid mask, per-question reason lists,
+    predicted categories, ids of the questions each one duplicates).
+    """
+    count = len(questions)
+    if count == 0:
+        return np.ones(0, dtype=bool), [], [], []
+    
+    # A malformed item fails the structural checks instead of failing the batch
+    questions = [q if isinstance(q, dict) else {} for q in questions]
+    duplicate_of = find_near_duplicates(questions)
+    
+    question_length = np.fromiter((field_length(q, "question", str) for q in questions), dtype=np.intp, count=count)
+    option_count = np.fromiter((field_length(q, "options", list) for q in questions), dtype=np.intp, count=count)
+    has_answer = np.fromiter(("correctAnswer" in q for q in questions), dtype=bool, count=count)
+    explanation_length = np.fromiter((field_length(q, "explanation", str) for q in questions), dtype=np.intp, count=count)
+    
+    failures = {
+        "category_mismatch": np.zeros(count, dtype=bool),
+        "question_too_short": question_length <= 10,
+        "wrong_option_count": option_count != 4,
+        "missing_correct_answer": ~has_answer,
+        "explanation_too_short": explanation_length <= 20,
+        "near_duplicate": np.array([match is not None for match in duplicate_of]),
+    }
+    predicted_categories = [None] * count
+    
+    models = load_models()
+    if models:
+        try:
+            X, features_ok = build_feature_matrix(questions)
+            predicted = models["category_encoder"].inverse_transform(models["feature_classifier"].predict(X))
+        except Exception as e:
+            print(f"Validation error: {e}", file=sys.stderr)  # Category check skipped on error
+        else:
+            # Questions whose features could not be built are not held to the model check
+            failures["category_mismatch"] = features_ok & (predicted != expected_category)
+            predicted_categories = [str(cat) if ok else None for cat, ok in zip(predicted, features_ok)]
+    
+    reasons = [[] for _ in range(count)]
+    valid = np.ones(count, dtype=bool)
+    for check in REJECTION_CHECKS:
+        valid &= ~failures[check]
+        for i in np.flatnonzero(failures[check]):
+            reasons[i].append(check)
+    
+    return valid, reasons, predicted_categories, duplicate_of
+
+def validate_generated_question(question, expected_category, expected_difficulty):
+    """Validate a generated question against learned patterns"""
+    valid, _, _, _ = validate_questions_batch([question], expected_category, expected_difficulty)
+    return bool(valid[0])
+
+def validate_questions(questions, category, difficulty):
+    """Validate a batch and report which questions were rejected and why"""
+    valid, reasons, predicted, duplicate_of = validate_questions_batch(questions, category, difficulty)
+    return {
+        "validated_count": int(valid.sum()),
+        "total_count": len(questions),
+        "questions": [q for q, ok in zip(questions, valid) if ok],
+        "rejected": [
+            {"index": int(i), "reasons": reasons[i], "predicted_category": predicted[i], "duplicate_of": duplicate_of[i]}
+            for i in np.flatnonzero(~valid)
+        ],
+    }
+
+def get_prompt_guidance(data):
+    return generate_ml_guided_prompt(
+        data.get("category", "algorithms"),
+        data.get("difficulty", "medium"),
+        data.get("career_path"),
+    )
+
+def validate_questions_request(data):
+    return validate_questions(data.get("questions", []), data.get("category"), data.get("difficulty"))
+
+HANDLERS = {
+    "get_prompt_guidance": get_prompt_guidance,
+    "validate_questions": validate_questions_request,
+}
+
+def handle_request(request):
+    """Run a single {"command", "data"} request and return the response payload"""
+    if not isinstance(request, dict):
+        return {"success": False, "error": "Request must be a JSON object"}
+    
+    command = request.get("command")
+    if command not in HANDLERS:
+        return {"success": False, "error": f"Unknown command: {command}"}
+    
+    try:
+        result = HANDLERS[command](request.get("data", {}))
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "result": result}
+
+def serve_stdin():
+    """Persistent worker: read newline-delimited JSON requests, write one JSON response per line.
+    
+    Models are loaded once up front. A request may carry an "id", which is echoed
+    back so callers can pipeline several requests on one process.
+    """
+    load_models()
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
         
-        return is_valid
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"success": False, "error": f"Invalid JSON: {str(e)}"}
+        else:
+            response = handle_request(request)
+            if isinstance(request, dict) and "id" in request:
+                response["id"] = request["id"]
         
-    except Exception as e:
-        print(f"Validation error: {e}", file=sys.stderr)
-        return True  # Allow on error
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
 
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({"error": "No command provided"}))
         sys.exit(1)
     
+    if sys.argv[1] == "--serve":
+        serve_stdin()
+        return
+    
     try:
         request = json.loads(sys.argv[1])
-        command = request.get("command")
-        data = request.get("data", {})
-        
-        if command == "get_prompt_guidance":
-            category = data.get("category", "algorithms")
-            difficulty = data.get("difficulty", "medium")
-            career_path = data.get("career_path")
-            
-            guidance = generate_ml_guided_prompt(category, difficulty, career_path)
-            print(json.dumps({"success": True, "result": guidance}))
-            
-        elif command == "validate_questions":
-            questions = data.get("questions", [])
-            category = data.get("category")
-            difficulty = data.get("difficulty")
-            
-            validated = []
-            for q in questions:
-                if validate_generated_question(q, category, difficulty):
-                    validated.append(q)
-            
-            print(json.dumps({
-                "success": True,
-                "result": {
-                    "validated_count": len(validated),
-                    "total_count": len(questions),
-                    "questions": validated
-                }
-            }))
-            
-        else:
-            print(json.dumps({"success": False, "error": f"Unknown command: {command}"}))
-            
-    except Exception as e:
+    except json.JSONDecodeError as e:
         print(json.dumps({"success": False, "error": str(e)}))
         sys.exit(1)
+    
+    response = handle_request(request)
+    print(json.dumps(response))
+    if not response["success"] and isinstance(request, dict) and request.get("command") in HANDLERS:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
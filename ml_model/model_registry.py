@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Lazy model registry for CareerQuest ML services
+Behaves like the dict returned by load_models(), but each artifact in
+saved_models/ is only deserialized the first time it is accessed, and is
+reloaded after its file changes on disk
+"""
+
+import sys
+import json
+import time
+import pickle
+import threading
+from collections.abc import Mapping
+
+from startup_profiler import profile_phase
+
+try:
+    import joblib
+except ImportError:  # joblib is optional; without it only pickles are used
+    joblib = None
+
+# Uncompressed joblib dumps keep NumPy arrays as raw buffers that can be
+# memory-mapped, so workers on one host share those pages instead of each
+# holding a private unpickled copy.
+MMAP_SUFFIX = ".joblib"
+
+# How often (seconds) loaded artifacts are re-stat'ed for changes
+STALE_CHECK_INTERVAL = 1.0
+
+_sklearn_imported = False
+
+
+def import_sklearn():
+    """Import sklearn once as its own profiled phase.
+
+    Unpickling the first model would otherwise import it implicitly and
+    charge its cost to that model's load.
+    """
+    global _sklearn_imported
+    if _sklearn_imported:
+        return
+    _sklearn_imported = True
+    try:
+        with profile_phase("import sklearn", "import"):
+            import sklearn  # noqa: F401
+    except ImportError:
+        pass  # Models that need it will fail to load and be reported
+
+
+def load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_mmap(path):
+    return joblib.load(path, mmap_mode="r")
+
+
+LOADERS = {
+    ".pkl": load_pickle,
+    ".json": load_json,
+    MMAP_SUFFIX: load_mmap,
+}
+
+
+def mmap_path(path):
+    """Memory-mappable export of a pickle artifact, or None if absent or stale"""
+    if joblib is None or path.suffix != ".pkl":
+        return None
+    candidate = path.with_suffix(MMAP_SUFFIX)
+    try:
+        if candidate.stat().st_mtime >= path.stat().st_mtime:
+            return candidate
+    except FileNotFoundError:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def export_mmap(base_dir, files):
+    """Re-save every pickle artifact as an uncompressed joblib file next to it.
+
+    Returns the written paths. Arrays held by reference (TF-IDF idf_, Naive Bayes
+    log-probabilities, scaler statistics) stay memory-mapped after loading;
+    sklearn tree ensembles copy their node arrays when unpickled, so they only
+    gain the faster load.
+    """
+    if joblib is None:
+        raise RuntimeError("joblib is required to export memory-mapped models")
+
+    written = []
+    for filename in files.values():
+        path = base_dir / filename
+        if path.suffix != ".pkl" or not path.exists():
+            continue
+        target = path.with_suffix(MMAP_SUFFIX)
+        joblib.dump(load_pickle(path), target, compress=0)
+        written.append(target)
+    return written
+
+
+class ModelRegistry(Mapping):
+    """Read-only mapping of model name -> artifact that loads each artifact on first access.
+
+    `name in registry` only checks that the file exists (and has not failed to
+    load), so availability checks never trigger a load. An artifact whose file
+    mtime changes after it was loaded (or failed to load) is dropped and loaded
+    again on next access; `generation` counts these invalidations so callers
+    can rebuild tables derived from the models.
+    """
+
+    def __init__(self, base_dir, files, check_interval=STALE_CHECK_INTERVAL):
+        self.base_dir = base_dir
+        self.files = dict(files)
+        self.check_interval = check_interval
+        self.generation = 0
+        self._loaded = {}
+        self._errors = {}
+        self._signatures = {}  # key -> (source path, mtime_ns) when loaded or failed
+        self._checked_at = time.monotonic()
+        self._lock = threading.RLock()
+
+    def register(self, files):
+        """Add artifacts (name -> file name) to the registry"""
+        with self._lock:
+            for key, filename in files.items():
+                if self.files.setdefault(key, filename) != filename:
+                    raise ValueError(f"Model {key!r} is already registered as {self.files[key]}")
+        return self
+
+    def path(self, key):
+        return self.base_dir / self.files[key]
+
+    def source(self, key):
+        """File an artifact will be loaded from, preferring the memory-mappable export"""
+        path = self.path(key)
+        return mmap_path(path) or path
+
+    def is_available(self, key):
+        if key in self._loaded:
+            return True
+        return key in self.files and key not in self._errors and self.source(key).exists()
+
+    def __contains__(self, key):
+        return self.is_available(key)
+
+    def _signature(self, key):
+        path = self.source(key)
+        try:
+            return path, path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return path, None
+
+    def invalidate_stale(self):
+        """Drop artifacts whose file changed since they were loaded; returns their names"""
+        with self._lock:
+            stale = [key for key, signature in self._signatures.items() if self._signature(key) != signature]
+            for key in stale:
+                self._loaded.pop(key, None)
+                self._errors.pop(key, None)
+                del self._signatures[key]
+            if stale:
+                self.generation += 1
+                print(f"Model files changed, reloading on next use: {', '.join(stale)}", file=sys.stderr)
+        return stale
+
+    def _check_stale(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self.invalidate_stale()
+
+    def __getitem__(self, key):
+        self._check_stale()
+        try:
+            return self._loaded[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+            if not self.is_available(key):
+                raise KeyError(key)
+
+            signature = self._signature(key)
+            path = signature[0]
+            if path.suffix != ".json":
+                import_sklearn()
+            try:
+                with profile_phase(f"load {path.name}", "model"):
+                    value = LOADERS[path.suffix](path)
+            except Exception as e:
+                self._errors[key] = f"Failed to load {key}: {e}"
+                self._signatures[key] = signature
+                print(f"Warning: Failed to load {key}: {e}", file=sys.stderr)
+                raise KeyError(key) from e
+
+            self._loaded[key] = value
+            self._signatures[key] = signature
+            return value
+
+    def __iter__(self):
+        return iter(self.available())
+
+    def __len__(self):
+        return len(self.available())
+
+    def available(self):
+        """Names of artifacts that can be loaded, without loading them"""
+        return [key for key in self.files if self.is_available(key)]
+
+    def loaded(self):
+        """Names of artifacts already deserialized"""
+        return list(self._loaded)
+
+    def missing(self):
+        """File names that do not exist on disk"""
+        return [filename for key, filename in self.files.items() if not self.source(key).exists()]
+
+    def errors(self):
+        return [f"Model file not found: {filename}" for filename in self.missing()] + list(self._errors.values())
+
+    def warm(self, keys=None):
+        """Eagerly load the given artifacts (all available ones by default)"""
+        for key in (self.files if keys is None else keys):
+            if key in self:
+                try:
+                    self[key]
+                except KeyError:
+                    pass
+        return self
+
+
+_shared_registries = {}
+_shared_lock = threading.Lock()
+
+
+def shared_registry(base_dir, files):
+    """Process-wide registry for a model directory.
+
+    prediction_service and hybrid_generator both call this, so in one process
+    (e.g. the HTTP service) each artifact is loaded once however many modules use it.
+    """
+    key = base_dir.resolve()
+    with _shared_lock:
+        registry = _shared_registries.get(key)
+        if registry is None:
+            registry = _shared_registries[key] = ModelRegistry(base_dir, files)
+    return registry.register(files)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate question detection for CareerQuest ML services
+MinHash signatures over content-word shingles, bucketed with LSH banding, so
+checking a question against the bank touches only the few questions that
+share a band instead of the whole bank. Candidates from the buckets are
+confirmed with the exact Jaccard similarity of their shingle sets.
+
+Shingles are hashed with Python's string hash, which is only stable within a
+process, so an index is built (or inherited through fork) by the process that
+queries it and is never persisted.
+"""
+
+import os
+import re
+
+import numpy as np
+
+# Jaccard similarity of shingle sets at or above which two questions are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("ML_NEAR_DUPLICATE_THRESHOLD", "0.5"))
+
+# 16 bands x 4 rows puts the LSH candidate threshold near 0.5
+NUM_PERM = 64
+NUM_BANDS = 16
+
+# Signatures computed per chunk when hashing many questions at once
+MINHASH_CHUNK_SIZE = 4096
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how in is it its of on or that the this
+to what when where which who why will with you your whats used use
+explain describe define mean means meaning
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_rng = np.random.default_rng(0x5EED)
+# Multiply-shift hash family: h(x) = (a * x + b) mod 2**64 >> 32, with odd a
+_PERM_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+# Odd multipliers folding each band's rows into one bucket key
+_BAND_MIX = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_EMPTY_SIGNATURE = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+
+def shingles(text):
+    """Content words and adjacent content-word pairs of a question"""
+    tokens = [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+    return frozenset(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def is_near_duplicate(a, b, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """Whether two shingle sets are near-duplicates; sets without content words never are"""
+    return bool(a) and bool(b) and jaccard(a, b) >= threshold
+
+
+def minhash_many(shingle_sets):
+    """MinHash signatures for many shingle sets: array of shape (len(shingle_sets), NUM_PERM)"""
+    signatures = np.tile(_EMPTY_SIGNATURE, (len(shingle_sets), 1))
+    for start in range(0, len(shingle_sets), MINHASH_CHUNK_SIZE):
+        chunk = shingle_sets[start:start + MINHASH_CHUNK_SIZE]
+        rows = [i for i, s in enumerate(chunk) if s]
+        if not rows:
+            continue
+        lengths = np.array([len(chunk[i]) for i in rows])
+        hashes = np.fromiter((hash(s) for i in rows for s in chunk[i]), dtype=np.int64, count=int(lengths.sum())).view(np.uint64)
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) >> np.uint64(32)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[start + np.array(rows)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return signatures
+
+
+def band_keys(signatures, num_bands=NUM_BANDS):
+    """Fold each band of each signature into one integer bucket key: array (n, num_bands)"""
+    rows = NUM_PERM // num_bands
+    with np.errstate(over="ignore"):
+        mixed = signatures[:, :num_bands * rows] * _BAND_MIX[None, :num_bands * rows]
+    return mixed.reshape(len(signatures), num_bands, rows).sum(axis=2, dtype=np.uint64)
+
+
+class NearDuplicateIndex:
+    """Incrementally updated MinHash/LSH index of question texts keyed by question id."""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, num_bands=NUM_BANDS):
+        self.threshold = threshold
+        self.num_bands = num_bands
+        self.rows = NUM_PERM // num_bands
+        self._buckets = [{} for _ in range(num_bands)]
+        self._shingles = {}
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def __contains__(self, key):
+        return key in self._shingles
+
+    def _insert(self, keys, shingle_sets, signatures):
+        for key, shingle_set, signature in zip(keys, shingle_sets, signatures):
+            self._shingles[key] = shingle_set
+            self._signatures[key] = signature
+        for buckets, column in zip(self._buckets, band_keys(signatures, self.num_bands).T.tolist()):
+            for key, band_key in zip(keys, column):
+                buckets.setdefault(band_key, []).append(key)
+
+    def add(self, key, text=None, shingle_set=None, signature=None):
+        """Index one question; pass precomputed shingles/signature to skip hashing"""
+        if key in self._shingles:
+            return
+        if shingle_set is None:
+            shingle_set = shingles(text)
+        if signature is None:
+            signature = minhash_many([shingle_set])[0]
+        self._insert([key], [shingle_set], signature[None, :])
+
+    def add_many(self, keys, texts):
+        """Index many questions with one vectorized MinHash pass"""
+        new = {}
+        for key, text in zip(keys, texts):
+            if key not in self._shingles and key not in new:
+                new[key] = shingles(text)
+        if new:
+            self._insert(list(new), list(new.values()), minhash_many(list(new.values())))
+
+    def query(self, text=None, shingle_set=None, signature=None, exclude=None):
+        """(key, similarity) pairs at or above the threshold, most similar first"""
+        if shingle_set is None:
+            shingle_set = shingles(text)
+        if not shingle_set:
+            return []  # No content words to compare
+        if signature is None:
+            signature = minhash_many([shingle_set])[0]
+
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, band_keys(signature[None, :], self.num_bands)[0].tolist()):
+            candidates.update(buckets.get(band_key, ()))
+        candidates.discard(exclude)
+
+        matches = []
+        for key in candidates:
+            similarity = jaccard(shingle_set, self._shingles[key])
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def extended(self, keys, texts):
+        """New index over (keys, texts) that reuses this index's signatures for keys it already holds"""
+        index = NearDuplicateIndex(self.threshold, self.num_bands)
+        known = [key for key in dict.fromkeys(keys) if key in self._shingles]
+        if known:
+            index._insert(known, [self._shingles[key] for key in known], np.array([self._signatures[key] for key in known]))
+        index.add_many(keys, texts)
+        return index
+
+
+def build_near_duplicate_index(questions, previous=None):
+    """Index questions by id; `previous` (an index of an earlier bank) saves re-hashing unchanged ones"""
+    keys = [q["id"] for q in questions]
+    texts = [q["question"] for q in questions]
+    if previous is not None:
+        return previous.extended(keys, texts)
+    index = NearDuplicateIndex()
+    index.add_many(keys, texts)
+    return index
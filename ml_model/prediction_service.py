@@ -4,18 +4,61 @@ ML Prediction Service for CareerQuest
 Handles quiz generation, study suggestions, career recommendations using pre-trained models
 """
 
+import os
 import sys
 import json
-import pickle
-import numpy as np
 import random
+import re
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 
+from startup_profiler import format_report, get_report, profile_phase
+
+with profile_phase("import numpy", "import"):
+    import numpy as np
+
+from hybrid_generator import HANDLERS as HYBRID_HANDLERS
+from model_registry import export_mmap, shared_registry
+from near_duplicate import is_near_duplicate, shingles
+from question_bank import QUESTION_BANK_PATH, shared_source
+from question_index import effective_difficulty, lookup_questions
+from response_cache import CACHE_ENABLED, ResponseCache
+from quiz_pool import QUIZ_POOL_ENABLED, QuizPool
+from seen_filter import bloom_hashes, seen_mask
+
 SAVED_MODELS_DIR = Path(__file__).parent / "saved_models"
 
+# Upper bound on the shuffled candidate pool generate_quiz draws from, so the
+# per-request selection cost stays flat as the question bank grows.
+QUIZ_CANDIDATE_POOL_LIMIT = int(os.environ.get("ML_QUIZ_CANDIDATE_POOL", "200"))
+
+# Texts per sparse matrix when classifying large question packs
+CLASSIFY_CHUNK_SIZE = 1000
+
+MODEL_FILES = {
+    "question_classifier": "question_classifier.pkl",
+    "question_vectorizer": "question_vectorizer.pkl",
+    "question_label_encoder": "question_label_encoder.pkl",
+    "difficulty_predictor": "difficulty_predictor.pkl",
+    "difficulty_label_encoder": "difficulty_label_encoder.pkl",
+    "study_suggester": "study_suggester.pkl",
+    "study_label_encoder": "study_label_encoder.pkl",
+    "career_label_encoder": "career_label_encoder.pkl",
+    "random_forest": "random_forest.pkl",
+    "scaler": "scaler.pkl",
+    "features": "features.pkl",
+    "career_features": "career_features.json",
+}
+
+# Models to load eagerly on first load_models() call, e.g.
+# ML_WARM_MODELS="question_classifier,question_vectorizer" or "all"
+WARM_MODELS = [name.strip() for name in os.environ.get("ML_WARM_MODELS", "").split(",") if name.strip()]
+
 _models_cache = None
 _models_status = {"loaded": False, "errors": []}
+_question_confidence = None
+_question_confidence_generation = None
 
 def log_startup():
     """Log application startup information"""
@@ -40,14 +83,14 @@ def log_models_loaded(models):
         ml_models.append("Study Suggester")
     if "scaler" in models:
         ml_models.append("Feature Scaler")
-    if "features" in models:
+    if "features" in models.loaded():
         feature_count = len(models["features"]) if isinstance(models["features"], list) else 12
         print(f"   Features: {feature_count} features", file=sys.stderr)
     
     for model_name in ml_models:
         print(f"   ✓ {model_name}", file=sys.stderr)
     
-    print(f"   Question Bank: {len(QUESTION_BANK)} questions across 5 categories\n", file=sys.stderr)
+    print(f"   Question Bank: {len(get_question_bank())} questions across 5 categories\n", file=sys.stderr)
 
 def log_prediction_request(command, data, result=None, error=None):
     """Log prediction requests with results"""
@@ -60,6 +103,8 @@ def log_prediction_request(command, data, result=None, error=None):
         print(f"   Career Path: {data.get('career_path', 'fullstack')}", file=sys.stderr)
         print(f"   Count: {data.get('count', 5)} questions", file=sys.stderr)
         print(f"   User Level: {data.get('level', 10)}", file=sys.stderr)
+        if data.get("seed") is not None:
+            print(f"   Seed: {data.get('seed')}", file=sys.stderr)
         if result:
             print(f"   ✅ Generated: {len(result)} unique questions", file=sys.stderr)
     
@@ -87,6 +132,31 @@ def log_prediction_request(command, data, result=None, error=None):
             print(f"   ✅ Category: {result.get('category', 'N/A')}", file=sys.stderr)
             print(f"   Confidence: {int(result.get('confidence', 0) * 100)}%", file=sys.stderr)
     
+    elif command == "classify_questions":
+        print(f"\n🔍 Batch Question Classification Request | {timestamp}", file=sys.stderr)
+        print(f"   Texts: {len(data.get('texts', []))}", file=sys.stderr)
+        if result:
+            print(f"   ✅ Classified: {len(result)} questions", file=sys.stderr)
+    
+    elif command == "get_questions":
+        print(f"\n🗂️  Question Lookup Request | {timestamp}", file=sys.stderr)
+        print(f"   Ids: {len(data.get('ids', []))}", file=sys.stderr)
+        if result:
+            print(f"   ✅ Found: {sum(1 for q in result if q is not None)} questions", file=sys.stderr)
+    
+    elif command == "get_prompt_guidance":
+        print(f"\n🧭 Prompt Guidance Request | {timestamp}", file=sys.stderr)
+        print(f"   Category: {data.get('category', 'algorithms')}", file=sys.stderr)
+        print(f"   Difficulty: {data.get('difficulty', 'medium')}", file=sys.stderr)
+        if result:
+            print(f"   ✅ Examples: {len(result.get('examples', []))}", file=sys.stderr)
+    
+    elif command == "validate_questions":
+        print(f"\n🧪 Question Validation Request | {timestamp}", file=sys.stderr)
+        print(f"   Questions: {len(data.get('questions', []))}", file=sys.stderr)
+        if result:
+            print(f"   ✅ Valid: {result.get('validated_count', 0)}/{result.get('total_count', 0)}", file=sys.stderr)
+    
     elif command == "health_check":
         print(f"\n❤️  Health Check Request | {timestamp}", file=sys.stderr)
         if result:
@@ -96,65 +166,38 @@ def log_prediction_request(command, data, result=None, error=None):
     if error:
         print(f"   ❌ Error: {error}", file=sys.stderr)
 
-def load_models():
-    """Load all pre-trained ML models with validation"""
-    global _models_cache, _models_status
-    if _models_cache is not None:
-        return _models_cache
+def load_models(warm=None):
+    """Return the lazy model registry; each artifact is unpickled on first access.
     
-    # Log startup on first load
+    `warm` (or ML_WARM_MODELS) lists models to load eagerly; "all" loads everything.
+    """
+    global _models_cache, _models_status
     if _models_cache is None:
+        # Log startup on first load
         log_startup()
-    
-    models = {}
-    errors = []
-    
-    model_files = {
-        "question_classifier": "question_classifier.pkl",
-        "question_vectorizer": "question_vectorizer.pkl",
-        "question_label_encoder": "question_label_encoder.pkl",
-        "difficulty_predictor": "difficulty_predictor.pkl",
-        "difficulty_label_encoder": "difficulty_label_encoder.pkl",
-        "study_suggester": "study_suggester.pkl",
-        "study_label_encoder": "study_label_encoder.pkl",
-        "career_label_encoder": "career_label_encoder.pkl",
-        "random_forest": "random_forest.pkl",
-        "scaler": "scaler.pkl",
-        "features": "features.pkl",
+        
+        models = shared_registry(SAVED_MODELS_DIR, MODEL_FILES)
+        _models_cache = models
+        warm = WARM_MODELS if warm is None else warm
+        
+        # Log successful model loading
+        log_models_loaded(models)
+        
+        errors = models.errors()
+        if errors:
+            print(f"⚠️  ML Models loaded with {len(errors)} warnings:", file=sys.stderr)
+            for error in errors[:3]:  # Show first 3 errors
+                print(f"   - {error}", file=sys.stderr)
+    
+    if warm:
+        _models_cache.warm(None if "all" in warm else warm)
+    
+    _models_status = {
+        "loaded": True,
+        "errors": _models_cache.errors(),
+        "model_count": len(_models_cache.loaded()),
     }
-    
-    for key, filename in model_files.items():
-        filepath = SAVED_MODELS_DIR / filename
-        if filepath.exists():
-            try:
-                with open(filepath, "rb") as f:
-                    models[key] = pickle.load(f)
-            except Exception as e:
-                errors.append(f"Failed to load {key}: {e}")
-                print(f"Warning: Failed to load {key}: {e}", file=sys.stderr)
-        else:
-            errors.append(f"Model file not found: {filename}")
-    
-    career_features_path = SAVED_MODELS_DIR / "career_features.json"
-    if career_features_path.exists():
-        try:
-            with open(career_features_path, "r") as f:
-                models["career_features"] = json.load(f)
-        except Exception as e:
-            errors.append(f"Failed to load career_features: {e}")
-    
-    _models_cache = models
-    _models_status = {"loaded": True, "errors": errors, "model_count": len(models)}
-    
-    # Log successful model loading
-    log_models_loaded(models)
-    
-    if errors:
-        print(f"⚠️  ML Models loaded with {len(errors)} warnings:", file=sys.stderr)
-        for error in errors[:3]:  # Show first 3 errors
-            print(f"   - {error}", file=sys.stderr)
-    
-    return models
+    return _models_cache
 
 def get_default_level_range(difficulty):
     """Get default level range based on difficulty"""
@@ -165,689 +208,206 @@ def get_default_level_range(difficulty):
     }
     return defaults.get(difficulty, [1, 30])
 
-QUESTION_BANK = [
-    # =============== ALGORITHMS - EASY ===============
-    {
-        "question": "What is the time complexity of binary search?",
-        "options": ["O(n)", "O(log n)", "O(n^2)", "O(1)"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "easy",
-        "explanation": "Binary search has O(log n) complexity because it halves the search space each iteration.",
-        "level_range": [1, 8]
-    },
-    {
-        "question": "What is an array?",
-        "options": ["A function type", "A collection of elements stored at contiguous memory locations", "A type of loop", "A database table"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "easy",
-        "explanation": "An array is a data structure that stores elements of the same type in contiguous memory locations.",
-        "level_range": [1, 5]
-    },
-    {
-        "question": "What does FIFO stand for in queue data structures?",
-        "options": ["First In First Out", "First In Final Output", "Fast Input Fast Output", "Fixed Input Fixed Output"],
-        "correctAnswer": 0,
-        "category": "algorithms",
-        "difficulty": "easy",
-        "explanation": "FIFO means First In First Out - the first element added is the first one removed.",
-        "level_range": [1, 6]
-    },
-    {
-        "question": "What is the time complexity of accessing an element in an array by index?",
-        "options": ["O(n)", "O(log n)", "O(n^2)", "O(1)"],
-        "correctAnswer": 3,
-        "category": "algorithms",
-        "difficulty": "easy",
-        "explanation": "Array access by index is O(1) constant time because elements are stored at contiguous memory locations.",
-        "level_range": [1, 7]
-    },
-    {
-        "question": "What is a stack data structure?",
-        "options": ["FIFO structure", "LIFO structure", "Random access structure", "Sorted structure"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "easy",
-        "explanation": "A stack is a LIFO (Last In First Out) data structure where the last element added is the first removed.",
-        "level_range": [1, 6]
-    },
-    # =============== ALGORITHMS - MEDIUM ===============
-    {
-        "question": "What is recursion?",
-        "options": ["A loop type", "A function that calls itself", "A data structure", "An error type"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "medium",
-        "explanation": "Recursion is a programming technique where a function calls itself to solve smaller instances of the same problem.",
-        "level_range": [6, 15]
-    },
-    {
-        "question": "What is Big O notation used for?",
-        "options": ["Measuring code length", "Describing algorithm efficiency", "Formatting output", "Managing memory"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "medium",
-        "explanation": "Big O notation describes the upper bound of an algorithm's time or space complexity.",
-        "level_range": [5, 14]
-    },
-    {
-        "question": "What is a hash table?",
-        "options": ["A type of database", "A data structure using key-value pairs with O(1) average lookup", "A sorting algorithm", "A file format"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "medium",
-        "explanation": "A hash table is a data structure that stores key-value pairs and provides O(1) average time complexity for lookups.",
-        "level_range": [7, 16]
-    },
-    {
-        "question": "What is the worst-case time complexity of quicksort?",
-        "options": ["O(n)", "O(n log n)", "O(n^2)", "O(log n)"],
-        "correctAnswer": 2,
-        "category": "algorithms",
-        "difficulty": "medium",
-        "explanation": "Quicksort's worst case is O(n^2) when the pivot selection consistently results in unbalanced partitions.",
-        "level_range": [8, 17]
-    },
-    {
-        "question": "What is a linked list?",
-        "options": ["An array variant", "A sequence of nodes where each node points to the next", "A tree structure", "A hash function"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "medium",
-        "explanation": "A linked list is a linear data structure where elements are stored in nodes that contain data and a reference to the next node.",
-        "level_range": [5, 14]
-    },
-    {
-        "question": "What is the time complexity of inserting at the beginning of a linked list?",
-        "options": ["O(n)", "O(log n)", "O(n^2)", "O(1)"],
-        "correctAnswer": 3,
-        "category": "algorithms",
-        "difficulty": "medium",
-        "explanation": "Inserting at the beginning of a linked list is O(1) because you only need to update the head pointer.",
-        "level_range": [6, 15]
-    },
-    # =============== ALGORITHMS - HARD ===============
-    {
-        "question": "What is memoization?",
-        "options": ["A memory type", "Caching function results to avoid redundant calculations", "A debugging technique", "A testing method"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "hard",
-        "explanation": "Memoization is an optimization technique that caches the results of expensive function calls to avoid redundant calculations.",
-        "level_range": [15, 30]
-    },
-    {
-        "question": "What is the time complexity of Dijkstra's algorithm with a binary heap?",
-        "options": ["O(V)", "O(E log V)", "O(V^2)", "O(E + V)"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "hard",
-        "explanation": "Dijkstra's algorithm with a binary heap has O(E log V) complexity where E is edges and V is vertices.",
-        "level_range": [18, 30]
-    },
-    {
-        "question": "What is dynamic programming?",
-        "options": ["Writing code dynamically", "Breaking problems into overlapping subproblems and storing their solutions", "Runtime code generation", "Automatic memory management"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "hard",
-        "explanation": "Dynamic programming solves complex problems by breaking them into simpler overlapping subproblems and storing results to avoid recomputation.",
-        "level_range": [16, 30]
-    },
-    {
-        "question": "What is the amortized time complexity of adding to a dynamic array?",
-        "options": ["O(n)", "O(log n)", "O(n^2)", "O(1)"],
-        "correctAnswer": 3,
-        "category": "algorithms",
-        "difficulty": "hard",
-        "explanation": "While individual insertions may trigger O(n) resizing, the amortized cost across many insertions is O(1).",
-        "level_range": [17, 30]
-    },
-    {
-        "question": "What is a balanced binary search tree?",
-        "options": ["A tree with equal values", "A BST where height difference between subtrees is bounded", "A complete binary tree", "A tree with no duplicates"],
-        "correctAnswer": 1,
-        "category": "algorithms",
-        "difficulty": "hard",
-        "explanation": "A balanced BST maintains a bounded height difference between left and right subtrees, ensuring O(log n) operations.",
-        "level_range": [16, 30]
-    },
-    
-    # =============== FRONTEND - EASY ===============
-    {
-        "question": "What does CSS stand for?",
-        "options": ["Creative Style Sheets", "Cascading Style Sheets", "Computer Style Sheets", "Colorful Style Sheets"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "easy",
-        "explanation": "CSS stands for Cascading Style Sheets, used for styling web pages.",
-        "level_range": [1, 6]
-    },
-    {
-        "question": "What is the difference between let and const in JavaScript?",
-        "options": ["No difference", "let can be reassigned, const cannot", "const is faster", "let is deprecated"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "easy",
-        "explanation": "let allows variable reassignment while const creates a read-only reference that cannot be reassigned.",
-        "level_range": [1, 7]
-    },
-    {
-        "question": "What does HTML stand for?",
-        "options": ["Hyper Text Markup Language", "High Tech Modern Language", "Hyper Transfer Markup Language", "Home Tool Markup Language"],
-        "correctAnswer": 0,
-        "category": "frontend",
-        "difficulty": "easy",
-        "explanation": "HTML stands for HyperText Markup Language, the standard language for creating web pages.",
-        "level_range": [1, 5]
-    },
-    {
-        "question": "Which HTML tag is used for the largest heading?",
-        "options": ["<h6>", "<heading>", "<h1>", "<head>"],
-        "correctAnswer": 2,
-        "category": "frontend",
-        "difficulty": "easy",
-        "explanation": "<h1> is used for the largest heading in HTML, with <h6> being the smallest.",
-        "level_range": [1, 5]
-    },
-    {
-        "question": "What is the CSS property to change text color?",
-        "options": ["text-color", "font-color", "color", "foreground"],
-        "correctAnswer": 2,
-        "category": "frontend",
-        "difficulty": "easy",
-        "explanation": "The 'color' property in CSS is used to change the text color of an element.",
-        "level_range": [1, 6]
-    },
-    # =============== FRONTEND - MEDIUM ===============
-    {
-        "question": "What is React's virtual DOM?",
-        "options": ["A browser API", "An in-memory representation of the real DOM", "A database", "A server component"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "medium",
-        "explanation": "React's virtual DOM is an in-memory representation that React uses to optimize updates to the real DOM.",
-        "level_range": [8, 18]
-    },
-    {
-        "question": "What is a closure in JavaScript?",
-        "options": ["A way to close files", "A function that has access to its outer scope", "A type of loop", "An error handler"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "medium",
-        "explanation": "A closure is a function that retains access to variables from its outer (enclosing) scope even after that scope has finished executing.",
-        "level_range": [7, 16]
-    },
-    {
-        "question": "What is the purpose of the useEffect hook in React?",
-        "options": ["State management", "Performing side effects", "Routing", "Form validation"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "medium",
-        "explanation": "useEffect is a React hook for performing side effects like data fetching, subscriptions, or DOM manipulation.",
-        "level_range": [9, 18]
-    },
-    {
-        "question": "What is CSS Flexbox used for?",
-        "options": ["Animation", "One-dimensional layout", "Database queries", "Server rendering"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "medium",
-        "explanation": "Flexbox is a CSS layout model designed for one-dimensional layouts, making it easy to align and distribute space among items.",
-        "level_range": [6, 15]
-    },
-    {
-        "question": "What is event bubbling in JavaScript?",
-        "options": ["Creating events", "Events propagating from child to parent elements", "Canceling events", "Event scheduling"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "medium",
-        "explanation": "Event bubbling is when an event triggered on a child element propagates up through its parent elements in the DOM tree.",
-        "level_range": [8, 17]
-    },
-    {
-        "question": "What is the purpose of useState in React?",
-        "options": ["Routing", "Managing component state", "Making API calls", "Styling components"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "medium",
-        "explanation": "useState is a React hook that allows functional components to have state variables.",
-        "level_range": [7, 16]
-    },
-    # =============== FRONTEND - HARD ===============
-    {
-        "question": "What is React's reconciliation algorithm?",
-        "options": ["A sorting algorithm", "The process of comparing virtual DOM trees to update the real DOM efficiently", "A security feature", "A routing mechanism"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "hard",
-        "explanation": "Reconciliation is React's diffing algorithm that compares virtual DOM trees to determine the minimal set of changes needed for the real DOM.",
-        "level_range": [17, 30]
-    },
-    {
-        "question": "What is tree shaking in webpack?",
-        "options": ["Reordering code", "Removing unused code from bundles", "Code compression", "Syntax checking"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "hard",
-        "explanation": "Tree shaking is a technique used to eliminate dead code by analyzing import/export statements to remove unused modules.",
-        "level_range": [16, 30]
-    },
-    {
-        "question": "What is the purpose of React.memo?",
-        "options": ["Memory allocation", "Memoizing component rendering to prevent unnecessary re-renders", "State persistence", "Error logging"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "hard",
-        "explanation": "React.memo is a higher-order component that memoizes the rendered output, preventing re-renders if props haven't changed.",
-        "level_range": [15, 30]
-    },
-    {
-        "question": "What is hydration in server-side rendering?",
-        "options": ["Adding water to servers", "Attaching event handlers to server-rendered HTML", "Database optimization", "Cache warming"],
-        "correctAnswer": 1,
-        "category": "frontend",
-        "difficulty": "hard",
-        "explanation": "Hydration is the process where client-side JavaScript takes over server-rendered HTML by attaching event handlers and making it interactive.",
-        "level_range": [18, 30]
-    },
-    
-    # =============== BACKEND - EASY ===============
-    {
-        "question": "Which HTTP method is used to update a resource?",
-        "options": ["GET", "POST", "PUT", "DELETE"],
-        "correctAnswer": 2,
-        "category": "backend",
-        "difficulty": "easy",
-        "explanation": "PUT is the HTTP method used to update or replace an existing resource.",
-        "level_range": [1, 7]
-    },
-    {
-        "question": "What is a primary key in a database?",
-        "options": ["Any column", "A unique identifier for each row", "The first column", "A foreign key reference"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "easy",
-        "explanation": "A primary key uniquely identifies each record in a database table.",
-        "level_range": [1, 6]
-    },
-    {
-        "question": "What is a REST API?",
-        "options": ["A database type", "An architectural style for web services", "A programming language", "A testing framework"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "easy",
-        "explanation": "REST (Representational State Transfer) is an architectural style for designing networked applications using HTTP methods.",
-        "level_range": [1, 8]
-    },
-    {
-        "question": "What HTTP status code indicates success?",
-        "options": ["404", "500", "200", "301"],
-        "correctAnswer": 2,
-        "category": "backend",
-        "difficulty": "easy",
-        "explanation": "HTTP status code 200 indicates that the request was successful.",
-        "level_range": [1, 6]
-    },
-    {
-        "question": "What does JSON stand for?",
-        "options": ["JavaScript Object Notation", "Java Standard Object Notation", "JavaScript Online Notation", "Java Serialized Object Notation"],
-        "correctAnswer": 0,
-        "category": "backend",
-        "difficulty": "easy",
-        "explanation": "JSON stands for JavaScript Object Notation, a lightweight data interchange format.",
-        "level_range": [1, 5]
-    },
-    # =============== BACKEND - MEDIUM ===============
-    {
-        "question": "What is the purpose of middleware in Express.js?",
-        "options": ["Database connection", "Process requests before reaching routes", "Render views", "Manage sessions only"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "medium",
-        "explanation": "Middleware functions in Express.js process requests before they reach route handlers.",
-        "level_range": [7, 16]
-    },
-    {
-        "question": "What is a foreign key in a database?",
-        "options": ["A key from another country", "A column that references a primary key in another table", "An encryption key", "A backup key"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "medium",
-        "explanation": "A foreign key is a column that creates a relationship between two tables by referencing the primary key of another table.",
-        "level_range": [6, 15]
-    },
-    {
-        "question": "What is connection pooling?",
-        "options": ["Swimming pool management", "Reusing database connections instead of creating new ones", "Network load balancing", "Thread management"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "medium",
-        "explanation": "Connection pooling maintains a cache of database connections that can be reused, improving performance.",
-        "level_range": [9, 18]
-    },
-    {
-        "question": "What is rate limiting?",
-        "options": ["Speed optimization", "Restricting the number of requests a user can make in a time period", "Database throttling", "Memory management"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "medium",
-        "explanation": "Rate limiting controls the rate of requests a user can make to an API to prevent abuse and ensure fair usage.",
-        "level_range": [8, 17]
-    },
-    {
-        "question": "What is an ORM?",
-        "options": ["Object Relational Mapping", "Online Resource Manager", "Output Render Module", "Object Runtime Memory"],
-        "correctAnswer": 0,
-        "category": "backend",
-        "difficulty": "medium",
-        "explanation": "ORM (Object Relational Mapping) is a technique that maps database tables to classes, allowing developers to interact with databases using objects.",
-        "level_range": [7, 16]
-    },
-    # =============== BACKEND - HARD ===============
-    {
-        "question": "What is database sharding?",
-        "options": ["Deleting old data", "Horizontally partitioning data across multiple databases", "Data encryption", "Backup strategy"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "hard",
-        "explanation": "Sharding is a database architecture pattern that horizontally partitions data across multiple database instances for scalability.",
-        "level_range": [17, 30]
-    },
-    {
-        "question": "What is eventual consistency in distributed systems?",
-        "options": ["Immediate data sync", "Data will become consistent given enough time without new updates", "Data validation", "Error handling"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "hard",
-        "explanation": "Eventual consistency guarantees that, given enough time without new updates, all replicas will converge to the same value.",
-        "level_range": [18, 30]
-    },
-    {
-        "question": "What is the CAP theorem?",
-        "options": ["A coding standard", "States that a distributed system can only guarantee two of three: Consistency, Availability, Partition tolerance", "A security protocol", "A testing methodology"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "hard",
-        "explanation": "CAP theorem states that a distributed data store can only provide two of three guarantees: Consistency, Availability, and Partition tolerance.",
-        "level_range": [19, 30]
-    },
-    {
-        "question": "What is a message queue?",
-        "options": ["An email system", "A system for asynchronous communication between services using messages", "A database type", "A logging mechanism"],
-        "correctAnswer": 1,
-        "category": "backend",
-        "difficulty": "hard",
-        "explanation": "A message queue enables asynchronous communication between services by storing messages until they can be processed.",
-        "level_range": [16, 30]
-    },
-    
-    # =============== DATA - EASY ===============
-    {
-        "question": "What is SQL used for?",
-        "options": ["Styling web pages", "Managing and querying relational databases", "Creating animations", "Building mobile apps"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "easy",
-        "explanation": "SQL (Structured Query Language) is used for managing and querying data in relational database systems.",
-        "level_range": [1, 7]
-    },
-    {
-        "question": "What is a database table?",
-        "options": ["A furniture piece", "A structured collection of data organized in rows and columns", "A type of graph", "A programming function"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "easy",
-        "explanation": "A database table is a collection of related data organized in rows (records) and columns (fields).",
-        "level_range": [1, 5]
-    },
-    {
-        "question": "What does SELECT do in SQL?",
-        "options": ["Deletes data", "Retrieves data from a database", "Creates tables", "Updates records"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "easy",
-        "explanation": "The SELECT statement is used to retrieve data from one or more tables in a database.",
-        "level_range": [1, 6]
-    },
-    # =============== DATA - MEDIUM ===============
-    {
-        "question": "What is the difference between SQL and NoSQL databases?",
-        "options": ["SQL is faster", "SQL uses structured tables, NoSQL uses flexible schemas", "NoSQL is always better", "They are the same"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "medium",
-        "explanation": "SQL databases use structured tables with predefined schemas, while NoSQL databases offer flexible, schema-less data storage.",
-        "level_range": [7, 16]
-    },
-    {
-        "question": "What is the purpose of indexes in databases?",
-        "options": ["Store data", "Speed up data retrieval", "Encrypt data", "Delete records"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "medium",
-        "explanation": "Indexes are data structures that speed up data retrieval operations by providing quick access paths to rows.",
-        "level_range": [8, 17]
-    },
-    {
-        "question": "What is a JOIN in SQL?",
-        "options": ["Connecting to a database", "Combining rows from two or more tables based on a related column", "Creating a backup", "Sorting data"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "medium",
-        "explanation": "A JOIN clause combines rows from two or more tables based on a related column between them.",
-        "level_range": [6, 15]
-    },
-    {
-        "question": "What is data aggregation?",
-        "options": ["Deleting data", "Combining multiple data points into a summary", "Encrypting data", "Backing up data"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "medium",
-        "explanation": "Data aggregation is the process of gathering and summarizing data, often using functions like COUNT, SUM, AVG.",
-        "level_range": [7, 16]
-    },
-    # =============== DATA - HARD ===============
-    {
-        "question": "What is normalization in databases?",
-        "options": ["Making data smaller", "Organizing data to reduce redundancy", "Encrypting data", "Deleting duplicates"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "hard",
-        "explanation": "Normalization is the process of organizing a database to reduce data redundancy and improve data integrity.",
-        "level_range": [15, 30]
-    },
-    {
-        "question": "What is ACID in database transactions?",
-        "options": ["A chemical property", "Atomicity, Consistency, Isolation, Durability", "A query language", "A backup method"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "hard",
-        "explanation": "ACID (Atomicity, Consistency, Isolation, Durability) is a set of properties that guarantee reliable database transactions.",
-        "level_range": [16, 30]
-    },
-    {
-        "question": "What is a data warehouse?",
-        "options": ["A physical storage facility", "A system for reporting and analysis using data from multiple sources", "A backup system", "A type of NoSQL database"],
-        "correctAnswer": 1,
-        "category": "data",
-        "difficulty": "hard",
-        "explanation": "A data warehouse is a central repository that aggregates data from multiple sources for analysis and reporting.",
-        "level_range": [17, 30]
-    },
-    
-    # =============== SECURITY - EASY ===============
-    {
-        "question": "What is SQL injection?",
-        "options": ["A database optimization technique", "An attack that inserts malicious SQL code", "A way to speed up queries", "A backup method"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "easy",
-        "explanation": "SQL injection is an attack where malicious SQL code is inserted into application queries to manipulate the database.",
-        "level_range": [1, 8]
-    },
-    {
-        "question": "What is HTTPS?",
-        "options": ["A programming language", "A secure version of HTTP using encryption", "A database type", "A file format"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "easy",
-        "explanation": "HTTPS is the secure version of HTTP that encrypts communication between the browser and server using TLS/SSL.",
-        "level_range": [1, 6]
-    },
-    {
-        "question": "What is a password hash?",
-        "options": ["An encrypted password", "A one-way transformation of a password for secure storage", "A password hint", "A temporary password"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "easy",
-        "explanation": "Password hashing transforms passwords into fixed-length strings that cannot be reversed, providing secure storage.",
-        "level_range": [1, 7]
-    },
-    # =============== SECURITY - MEDIUM ===============
-    {
-        "question": "What is XSS (Cross-Site Scripting)?",
-        "options": ["A CSS framework", "An attack that injects malicious scripts into web pages", "A browser feature", "A server configuration"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "medium",
-        "explanation": "XSS is a security vulnerability that allows attackers to inject malicious scripts into web pages viewed by others.",
-        "level_range": [7, 16]
-    },
-    {
-        "question": "What is CORS?",
-        "options": ["A programming language", "Cross-Origin Resource Sharing security mechanism", "A database type", "A CSS property"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "medium",
-        "explanation": "CORS (Cross-Origin Resource Sharing) is a security mechanism that controls how web pages can request resources from different domains.",
-        "level_range": [8, 17]
-    },
-    {
-        "question": "What is the difference between authentication and authorization?",
-        "options": ["They are the same", "Authentication verifies identity, authorization grants access", "Authorization comes first", "Neither is important"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "medium",
-        "explanation": "Authentication verifies who you are, while authorization determines what you're allowed to do.",
-        "level_range": [6, 15]
-    },
-    {
-        "question": "What is CSRF?",
-        "options": ["A file format", "Cross-Site Request Forgery attack", "A compression algorithm", "A caching mechanism"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "medium",
-        "explanation": "CSRF is an attack that tricks authenticated users into submitting unwanted requests to a web application.",
-        "level_range": [9, 18]
-    },
-    {
-        "question": "What is input validation?",
-        "options": ["User interface design", "Checking user input for correctness and safety before processing", "Database indexing", "Network monitoring"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "medium",
-        "explanation": "Input validation ensures that user-provided data meets expected criteria and is safe to process, preventing many attacks.",
-        "level_range": [5, 14]
-    },
-    # =============== SECURITY - HARD ===============
-    {
-        "question": "What is JWT token hijacking?",
-        "options": ["Creating tokens", "Stealing and misusing authentication tokens", "Token refresh", "Token generation"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "hard",
-        "explanation": "JWT hijacking occurs when an attacker steals a valid JWT token and uses it to impersonate the legitimate user.",
-        "level_range": [16, 30]
-    },
-    {
-        "question": "What is defense in depth?",
-        "options": ["Deep learning security", "Using multiple layers of security controls throughout a system", "Network depth analysis", "Code obfuscation"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "hard",
-        "explanation": "Defense in depth is a security strategy that uses multiple layers of controls, so if one fails, others provide protection.",
-        "level_range": [17, 30]
-    },
-    {
-        "question": "What is a zero-day vulnerability?",
-        "options": ["A minor bug", "A vulnerability unknown to software vendors and without a patch", "A testing technique", "A backup strategy"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "hard",
-        "explanation": "A zero-day vulnerability is a software flaw unknown to the vendor and has no available patch, making it highly dangerous.",
-        "level_range": [18, 30]
-    },
-    {
-        "question": "What is the OWASP Top 10?",
-        "options": ["A ranking of websites", "A list of the most critical web application security risks", "A testing framework", "A coding standard"],
-        "correctAnswer": 1,
-        "category": "security",
-        "difficulty": "hard",
-        "explanation": "The OWASP Top 10 is a regularly updated list of the most critical security risks to web applications.",
-        "level_range": [15, 30]
+QUESTION_CATEGORIES = ["algorithms", "backend", "data", "frontend", "security"]
+
+DIFFICULTY_MAP = {"easy": 1, "medium": 2, "hard": 3}
+
+CAREER_CATEGORY_WEIGHTS = {
+    "frontend": {"frontend": 2.0, "algorithms": 1.0, "security": 0.5},
+    "backend": {"backend": 2.0, "data": 1.5, "algorithms": 1.0, "security": 1.0},
+    "data": {"data": 2.0, "algorithms": 1.5, "backend": 1.0},
+    "cloud": {"backend": 1.5, "security": 1.5, "data": 1.0},
+    "mobile": {"frontend": 1.5, "backend": 1.0, "algorithms": 1.0},
+    "security": {"security": 2.0, "backend": 1.0, "algorithms": 0.5},
+    "fullstack": {"frontend": 1.5, "backend": 1.5, "algorithms": 1.0, "data": 1.0, "security": 0.5}
+}
+
+DEFAULT_CATEGORY_WEIGHT = 0.3
+
+# One row per career path, one column per category id; the extra last column
+# holds the weight for categories outside QUESTION_CATEGORIES.
+CAREER_WEIGHT_MATRIX = {
+    career: np.array(
+        [weights.get(cat, DEFAULT_CATEGORY_WEIGHT) for cat in QUESTION_CATEGORIES] + [DEFAULT_CATEGORY_WEIGHT]
+    )
+    for career, weights in CAREER_CATEGORY_WEIGHTS.items()
+}
+
+def on_question_bank_reload(bank):
+    """Drop pre-generated quizzes built from the previous bank version"""
+    if QUIZ_POOL is not None:
+        QUIZ_POOL.clear()
+
+# The question bank lives in question_bank.jsonl and is loaded on first use,
+# then reloaded whenever the file changes
+QUESTION_BANK_SOURCE = shared_source(QUESTION_BANK_PATH, get_default_level_range, on_reload=on_question_bank_reload)
+
+def get_question_bank():
+    """Return the current QuestionBank snapshot (questions, id store, inverted index)"""
+    return QUESTION_BANK_SOURCE.get()
+
+def __getattr__(name):
+    # QUESTION_BANK / QUESTION_INDEX / QUESTION_STORE used to be module constants
+    if name == "QUESTION_BANK":
+        return get_question_bank().questions
+    if name == "QUESTION_INDEX":
+        return get_question_bank().index
+    if name == "QUESTION_STORE":
+        return get_question_bank().store
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def build_question_confidence(models, texts):
+    """Precompute classifier confidence for the given question texts in one batch"""
+    if not texts or "question_classifier" not in models or "question_vectorizer" not in models:
+        return {}
+    
+    try:
+        text_vectors = models["question_vectorizer"].transform(texts)
+        prediction_proba = models["question_classifier"].predict_proba(text_vectors)
+        max_confidence = np.max(prediction_proba, axis=1)
+    except Exception as e:
+        print(f"Warning: Failed to precompute question confidence: {e}", file=sys.stderr)
+        return {}
+    
+    return {text: float(conf) for text, conf in zip(texts, max_confidence)}
+
+def build_question_columns(questions, confidence=None):
+    """Build a columnar (NumPy) view of the question bank for vectorized scoring"""
+    confidence = confidence or {}
+    category_ids = {cat: i for i, cat in enumerate(QUESTION_CATEGORIES)}
+    count = len(questions)
+    
+    level_low = np.empty(count)
+    level_high = np.empty(count)
+    category_id = np.empty(count, dtype=np.intp)
+    difficulty_id = np.empty(count, dtype=np.intp)
+    question_confidence = np.zeros(count)
+    qid = np.empty(count, dtype=np.intp)
+    
+    for i, q in enumerate(questions):
+        level_range = q.get("level_range") or get_default_level_range(q.get("difficulty", "medium"))
+        level_low[i], level_high[i] = level_range[0], level_range[1]
+        category_id[i] = category_ids.get(q["category"], len(QUESTION_CATEGORIES))
+        difficulty_id[i] = DIFFICULTY_MAP.get(q["difficulty"], 2)
+        question_confidence[i] = confidence.get(q["question"], 0.0)
+        qid[i] = q.get("qid", i)
+    
+    return {
+        "level_low": level_low,
+        "level_high": level_high,
+        "category_id": category_id,
+        "difficulty_id": difficulty_id,
+        "confidence": question_confidence,
+        "qid": qid,
+        "bloom_keys": bloom_hashes(qid),
     }
-]
 
-def calculate_question_score(question, user_level, career_path, target_difficulty=None):
-    """Calculate a relevance score for a question based on user profile using ML models"""
+def get_question_confidence(bank=None):
+    """Return the cached text -> classifier confidence table, loading the classifier if needed.
+    
+    The table covers exactly the bank's current texts. After a bank reload
+    only questions not seen before are classified, and texts no longer in
+    the bank are dropped; after the classifier files change the whole table
+    is rebuilt.
+    """
+    global _question_confidence, _question_confidence_generation
+    bank = bank or get_question_bank()
     models = load_models()
-    score = 0.0
-    
-    level_range = question.get("level_range")
-    if not level_range:
-        level_range = get_default_level_range(question.get("difficulty", "medium"))
-    if level_range[0] <= user_level <= level_range[1]:
-        score += 2.0
-        optimal_level = (level_range[0] + level_range[1]) / 2
-        level_distance = abs(user_level - optimal_level)
-        max_distance = (level_range[1] - level_range[0]) / 2
-        score += 1.0 * (1 - level_distance / max(max_distance, 1))
-    else:
-        distance = min(abs(user_level - level_range[0]), abs(user_level - level_range[1]))
-        score -= distance * 0.1
-    
-    category_weights = {
-        "frontend": {"frontend": 2.0, "algorithms": 1.0, "security": 0.5},
-        "backend": {"backend": 2.0, "data": 1.5, "algorithms": 1.0, "security": 1.0},
-        "data": {"data": 2.0, "algorithms": 1.5, "backend": 1.0},
-        "cloud": {"backend": 1.5, "security": 1.5, "data": 1.0},
-        "mobile": {"frontend": 1.5, "backend": 1.0, "algorithms": 1.0},
-        "security": {"security": 2.0, "backend": 1.0, "algorithms": 0.5},
-        "fullstack": {"frontend": 1.5, "backend": 1.5, "algorithms": 1.0, "data": 1.0, "security": 0.5}
-    }
-    
-    weights = category_weights.get(career_path, category_weights["fullstack"])
-    category_score = weights.get(question["category"], 0.3)
-    score += category_score
+    if _question_confidence_generation != models.generation:
+        _question_confidence = None
+    known = _question_confidence or {}
+    texts = {q["question"] for q in bank.questions}
+    new_texts = [text for text in texts if text not in known]
+    if _question_confidence is None or new_texts or len(known) != len(texts) - len(new_texts):
+        with profile_phase("question confidence table", "data"):
+            _question_confidence = {text: known[text] for text in texts if text in known}
+            _question_confidence.update(build_question_confidence(models, new_texts))
+        _question_confidence_generation = models.generation
+    return _question_confidence
+
+def get_question_columns(bank=None):
+    """Return the cached columnar view of a bank snapshot (the current one by default), building it after models load"""
+    bank = bank or get_question_bank()
+    generation = load_models().generation
+    columns, built_for = bank.derived.get("columns", (None, None))
+    if columns is None or built_for != generation:
+        confidence = get_question_confidence(bank)
+        with profile_phase("question columns build", "data"):
+            columns = build_question_columns(bank.questions, confidence)
+        bank.derived["columns"] = (columns, generation)
+    return columns
+
+def get_near_duplicate_index(bank=None):
+    """Return the near-duplicate index of a bank snapshot (the current one by default)"""
+    return QUESTION_BANK_SOURCE.near_duplicate_index(bank)
+
+def score_questions(columns, indices, user_level, career_path, target_difficulty=None, rng=None):
+    """Relevance scores of the given bank indices for a user profile.
+    
+    Each question gains points for a level range that covers user_level
+    (more near its middle, a penalty by distance outside it), the career
+    path's category weight, closeness to target_difficulty and the
+    classifier's confidence in its category, plus uniform jitter in [0, 0.3).
+    Jitter comes from `rng` (a NumPy Generator), so a seeded generator yields
+    reproducible scores; without one a fresh unseeded generator is used.
+    """
+    low = columns["level_low"][indices]
+    high = columns["level_high"][indices]
+    
+    in_range = (low <= user_level) & (user_level <= high)
+    optimal_level = (low + high) / 2
+    max_distance = np.maximum((high - low) / 2, 1)
+    in_range_score = 2.0 + 1.0 * (1 - np.abs(user_level - optimal_level) / max_distance)
+    distance = np.minimum(np.abs(user_level - low), np.abs(user_level - high))
+    score = np.where(in_range, in_range_score, 0.0 - distance * 0.1)
+    
+    weights = CAREER_WEIGHT_MATRIX.get(career_path, CAREER_WEIGHT_MATRIX["fullstack"])
+    score = score + weights[columns["category_id"][indices]]
     
     if target_difficulty:
-        difficulty_map = {"easy": 1, "medium": 2, "hard": 3}
-        target_val = difficulty_map.get(target_difficulty, 2)
-        question_val = difficulty_map.get(question["difficulty"], 2)
-        diff_match = 1.0 - abs(target_val - question_val) * 0.3
-        score += diff_match
+        target_val = DIFFICULTY_MAP.get(target_difficulty, 2)
+        score = score + (1.0 - np.abs(target_val - columns["difficulty_id"][indices]) * 0.3)
     
-    if models:
-        try:
-            if "question_classifier" in models and "question_vectorizer" in models:
-                vectorizer = models["question_vectorizer"]
-                classifier = models["question_classifier"]
-                text_vector = vectorizer.transform([question["question"]])
-                prediction_proba = classifier.predict_proba(text_vector)
-                max_confidence = np.max(prediction_proba)
-                score += max_confidence * 0.5
-        except Exception:
-            pass
+    score = score + columns["confidence"][indices] * 0.5
     
-    score += random.uniform(0, 0.3)
-    
-    return score
+    if rng is None:
+        rng = np.random.default_rng()
+    return score + rng.random(len(score)) * 0.3
+
+def select_top_candidates(indices, scores, k):
+    """Return the k highest-scoring bank indices, best first, without a full sort.
+    
+    Uses argpartition (O(n)) and only sorts the selected k. Ties keep bank order,
+    matching a stable descending sort of the whole array.
+    """
+    if k >= len(scores):
+        return indices[np.argsort(-scores, kind="stable")]
+    if k <= 0:
+        return indices[:0]
+    
+    top = np.sort(np.argpartition(-scores, k - 1)[:k])
+    return indices[top[np.argsort(-scores[top], kind="stable")]]
+
+def get_candidate_pool_size(count, available, requested=None):
+    """Number of top-scored questions to shuffle and pick a quiz from"""
+    if requested:
+        return max(count, min(int(requested), available))
+    return max(count * 3, min(available // 2, QUIZ_CANDIDATE_POOL_LIMIT))
+
+def make_quiz_rng(seed=None):
+    """Per-request RNGs: a random.Random for shuffles and a NumPy Generator for score jitter.
+    
+    Both derive from `seed`, so identical (seed, params) give identical quizzes;
+    with no seed they are seeded from OS entropy. Nothing touches global state,
+    which keeps concurrent requests in a threaded server independent.
+    """
+    rng = random.Random(seed)
+    return rng, np.random.default_rng(rng.getrandbits(64))
 
 def generate_quiz(data):
     """Generate quiz questions using ML-guided selection with randomization"""
     models = load_models()
+    rng, np_rng = make_quiz_rng(data.get("seed"))
     
     category = data.get("category", "mixed")
     difficulty = data.get("difficulty", "medium")
@@ -855,46 +415,69 @@ def generate_quiz(data):
     count = data.get("count", 5)
     level = data.get("level", 10)
     
-    level_to_difficulty = {
-        (1, 5): "easy",
-        (6, 12): "medium" if difficulty == "medium" else difficulty,
-        (13, 19): "medium",
-        (20, 30): "hard"
-    }
-    
-    if difficulty == "medium":
-        for range_tuple, diff in level_to_difficulty.items():
-            if range_tuple[0] <= level <= range_tuple[1]:
-                difficulty = diff
-                break
-    
-    # Filter available questions
-    available_questions = []
-    for q in QUESTION_BANK:
-        if category != "mixed" and q["category"] != category:
-            continue
-        available_questions.append(q)
-    
-    if not available_questions:
-        available_questions = QUESTION_BANK.copy()
-    
-    # Score and sort questions
-    scored_questions = []
-    for q in available_questions:
-        score = calculate_question_score(q, level, career_path, difficulty)
-        scored_questions.append((score, q))
+    difficulty = effective_difficulty(difficulty, level)
+    
+    # Filter available questions through the inverted index
+    bank = get_question_bank()
+    indices = lookup_questions(bank.index, category=None if category == "mixed" else category)
+    
+    if len(indices) == 0:
+        indices = bank.index["all"]
+    
+    columns = get_question_columns(bank)
+    
+    # Drop questions the user has already seen (bitset / Bloom filter over qids);
+    # if too few unseen questions are left, keep the seen ones only as top-up
+    excluded = 0
+    seen = None
+    if data.get("seen") or data.get("seen_bloom"):
+        bloom_keys = tuple(keys[indices] for keys in columns["bloom_keys"])
+        seen = seen_mask(data, columns["qid"][indices], bloom_keys)
+        unseen = len(indices) - int(seen.sum())
+        if unseen >= count:
+            excluded = len(indices) - unseen
+            indices = indices[~seen]
+            seen = None
+        else:
+            print(f"[ML Quiz] Only {unseen} unseen questions left; topping up with seen ones", file=sys.stderr)
     
-    scored_questions.sort(key=lambda x: x[0], reverse=True)
+    # Score questions and keep only the candidate pool (no full sort)
+    scores = score_questions(columns, indices, level, career_path, difficulty, np_rng)
     
     # Add strong randomization to prevent repetition
-    # Take top 50% of scored questions and shuffle them
-    top_half_count = max(count * 3, len(scored_questions) // 2)
-    top_candidates = [q for score, q in scored_questions[:top_half_count]]
-    random.shuffle(top_candidates)
+    # Take the top-scored pool (top 50% by default) and shuffle it
+    pool_size = get_candidate_pool_size(count, len(indices), data.get("candidate_pool"))
+    if seen is None:
+        top_candidates = [bank.questions[i] for i in select_top_candidates(indices, scores, pool_size)]
+        rng.shuffle(top_candidates)
+    else:
+        # Every unseen question comes first; the best-scored seen ones fill the rest
+        unseen_candidates = [bank.questions[i] for i in indices[~seen]]
+        seen_candidates = [bank.questions[i] for i in select_top_candidates(indices[seen], scores[seen], pool_size)]
+        rng.shuffle(unseen_candidates)
+        rng.shuffle(seen_candidates)
+        top_candidates = unseen_candidates + seen_candidates
     
     selected_questions = []
-    used_questions = set()  # Track by question text to avoid exact duplicates
+    used_questions = set()  # Track by question id to avoid exact duplicates
     used_categories = set()
+    selected_shingles = []
+    candidate_shingles = {}
+    
+    def is_repeat(q):
+        # Same question, or a paraphrase of one already selected (compared
+        # against the few selected questions only, not the whole bank)
+        if q["id"] in used_questions:
+            return True
+        shingle_set = candidate_shingles.get(q["id"])
+        if shingle_set is None:
+            shingle_set = candidate_shingles[q["id"]] = shingles(q["question"])
+        return any(is_near_duplicate(shingle_set, other) for other in selected_shingles)
+    
+    def select(q):
+        selected_questions.append(q)
+        used_questions.add(q["id"])
+        selected_shingles.append(candidate_shingles[q["id"]])
     
     if category == "mixed":
         # Ensure diversity across categories
@@ -903,21 +486,19 @@ def generate_quiz(data):
                 break
             
             # Skip if we've seen this exact question
-            if q["question"] in used_questions:
+            if is_repeat(q):
                 continue
             
             cat = q["category"]
             if cat not in used_categories or len(used_categories) >= 4:
-                selected_questions.append(q)
-                used_questions.add(q["question"])
+                select(q)
                 used_categories.add(cat)
         
         # Fill remaining slots
         while len(selected_questions) < count:
             for q in top_candidates:
-                if q["question"] not in used_questions:
-                    selected_questions.append(q)
-                    used_questions.add(q["question"])
+                if not is_repeat(q):
+                    select(q)
                     if len(selected_questions) >= count:
                         break
             break
@@ -926,12 +507,11 @@ def generate_quiz(data):
         for q in top_candidates[:count * 2]:  # Take 2x to ensure variety
             if len(selected_questions) >= count:
                 break
-            if q["question"] not in used_questions:
-                selected_questions.append(q)
-                used_questions.add(q["question"])
+            if not is_repeat(q):
+                select(q)
     
     # Final shuffle
-    random.shuffle(selected_questions)
+    rng.shuffle(selected_questions)
     
     result = []
     for q in selected_questions[:count]:
@@ -941,10 +521,12 @@ def generate_quiz(data):
             "correctAnswer": q["correctAnswer"],
             "category": q["category"],
             "difficulty": q["difficulty"],
-            "explanation": q["explanation"]
+            "explanation": q["explanation"],
+            "id": q["id"],
+            "qid": q["qid"]
         })
     
-    print(f"[ML Quiz] Generated {len(result)} unique questions from {len(available_questions)} available", file=sys.stderr)
+    print(f"[ML Quiz] Generated {len(result)} unique questions from {len(indices)} available ({excluded} seen excluded)", file=sys.stderr)
     
     return result
 
@@ -1034,111 +616,187 @@ def suggest_study(data):
     
     return suggestions
 
-def recommend_career(data):
-    """Recommend career path using ML model"""
-    models = load_models()
+CAREER_PROFILE_FIELDS = [
+    ("visual_design", 3),
+    ("backend_pref", 3),
+    ("math_stats", 3),
+    ("web_apps", 3),
+    ("data_interest", 3),
+    ("cloud_interest", 3),
+    ("mobile_interest", 3),
+    ("security_interest", 3),
+    ("frontend_perf", 0.5),
+    ("backend_perf", 0.5),
+    ("data_perf", 0.5),
+    ("algo_perf", 0.5),
+]
+
+CAREER_PATHS = ["frontend", "backend", "data", "cloud", "mobile", "security", "fullstack"]
+
+def build_career_profile_matrix(profiles):
+    """Stack assessment payloads into one (n, 12) float matrix using field defaults"""
+    return np.array(
+        [[float(p.get(field, default)) for field, default in CAREER_PROFILE_FIELDS] for p in profiles],
+        dtype=float
+    ).reshape(len(profiles), len(CAREER_PROFILE_FIELDS))
+
+def recommend_careers(profiles):
+    """Recommend career paths for many assessment payloads with one matrix computation"""
+    load_models()
     
-    visual_design = data.get("visual_design", 3)
-    backend_pref = data.get("backend_pref", 3)
-    math_stats = data.get("math_stats", 3)
-    web_apps = data.get("web_apps", 3)
-    data_interest = data.get("data_interest", 3)
-    cloud_interest = data.get("cloud_interest", 3)
-    mobile_interest = data.get("mobile_interest", 3)
-    security_interest = data.get("security_interest", 3)
-    frontend_perf = data.get("frontend_perf", 0.5)
-    backend_perf = data.get("backend_perf", 0.5)
-    data_perf = data.get("data_perf", 0.5)
-    algo_perf = data.get("algo_perf", 0.5)
+    X = build_career_profile_matrix(profiles)
+    (visual_design, backend_pref, math_stats, web_apps, data_interest, cloud_interest,
+     mobile_interest, security_interest, frontend_perf, backend_perf, data_perf, algo_perf) = X.T
     
     # ML gradient-boosting recommender removed; fallback heuristic used below.
     
-    career_scores = {
-        "frontend": (visual_design * 0.4) + (web_apps * 0.3) + (frontend_perf * 5 * 0.3),
-        "backend": (backend_pref * 0.4) + (web_apps * 0.2) + (backend_perf * 5 * 0.4),
-        "data": (math_stats * 0.4) + (data_interest * 0.3) + (data_perf * 5 * 0.3),
-        "cloud": (backend_pref * 0.3) + (cloud_interest * 0.4) + (backend_perf * 5 * 0.3),
-        "mobile": (visual_design * 0.3) + (mobile_interest * 0.4) + (frontend_perf * 5 * 0.3),
-        "security": (security_interest * 0.5) + (backend_perf * 5 * 0.3) + (algo_perf * 5 * 0.2),
-    }
-    
-    fullstack_score = (career_scores["frontend"] + career_scores["backend"]) / 2
-    career_scores["fullstack"] = fullstack_score
+    frontend = (visual_design * 0.4) + (web_apps * 0.3) + (frontend_perf * 5 * 0.3)
+    backend = (backend_pref * 0.4) + (web_apps * 0.2) + (backend_perf * 5 * 0.4)
+    career_scores = np.column_stack([
+        frontend,
+        backend,
+        (math_stats * 0.4) + (data_interest * 0.3) + (data_perf * 5 * 0.3),
+        (backend_pref * 0.3) + (cloud_interest * 0.4) + (backend_perf * 5 * 0.3),
+        (visual_design * 0.3) + (mobile_interest * 0.4) + (frontend_perf * 5 * 0.3),
+        (security_interest * 0.5) + (backend_perf * 5 * 0.3) + (algo_perf * 5 * 0.2),
+        (frontend + backend) / 2,
+    ])
+    
+    # Sum columns left to right so totals match the per-profile dict sum exactly
+    total_score = career_scores[:, 0].copy()
+    for col in range(1, career_scores.shape[1]):
+        total_score += career_scores[:, col]
+    probabilities = career_scores / total_score[:, None]
+    
+    recommended = np.argmax(career_scores, axis=1)
+    confidence = np.minimum(0.95, np.max(probabilities, axis=1) * 1.5)
+    
+    return [
+        {
+            "recommended_path": CAREER_PATHS[recommended[i]],
+            "probabilities": {path: float(probabilities[i, j]) for j, path in enumerate(CAREER_PATHS)},
+            "confidence": float(confidence[i])
+        }
+        for i in range(len(profiles))
+    ]
+
+def recommend_career(data):
+    """Recommend career path using ML model"""
+    return recommend_careers([data])[0]
+
+CLASSIFIER_KEYWORDS = {
+    "frontend": ["css", "html", "react", "vue", "angular", "dom", "ui", "ux", "style", "component", "javascript", "browser"],
+    "backend": ["api", "server", "database", "rest", "http", "node", "express", "endpoint", "request", "response", "middleware"],
+    "data": ["sql", "query", "table", "schema", "index", "normalization", "data", "analytics", "pandas", "numpy"],
+    "algorithms": ["complexity", "sort", "search", "tree", "graph", "recursion", "dynamic", "hash", "array", "linked"],
+    "security": ["xss", "sql injection", "csrf", "authentication", "authorization", "encryption", "https", "cors", "vulnerability"]
+}
+
+def compile_keyword_matcher(keywords):
+    """Compile every category keyword into one regex plus a keyword -> categories map.
+    
+    Keywords must start at a word boundary and may carry a common inflection
+    ("sorting", "trees"), so "ui" no longer matches inside "build". Longer
+    keywords are tried first, so "sql injection" wins over "sql".
+    """
+    keyword_categories = {}
+    for category, words in keywords.items():
+        for word in words:
+            keyword_categories.setdefault(word.lower(), []).append(category)
     
-    total_score = sum(career_scores.values())
-    probabilities = {k: v / total_score for k, v in career_scores.items()}
+    alternation = "|".join(re.escape(word) for word in sorted(keyword_categories, key=len, reverse=True))
+    pattern = re.compile(rf"\b({alternation})(?:s|es|ed|ing)?\b", re.IGNORECASE)
+    return pattern, keyword_categories
+
+_KEYWORD_PATTERN, _KEYWORD_CATEGORIES = compile_keyword_matcher(CLASSIFIER_KEYWORDS)
+
+def count_keyword_matches(text):
+    """Count distinct keyword hits per category in a single scan of the text"""
+    scores = {category: 0 for category in CLASSIFIER_KEYWORDS}
+    for word in {match.lower() for match in _KEYWORD_PATTERN.findall(text)}:
+        for category in _KEYWORD_CATEGORIES[word]:
+            scores[category] += 1
+    return scores
+
+def classify_by_keywords(text):
+    """Keyword-count fallback used when the ML classifier is unavailable"""
+    scores = count_keyword_matches(text)
     
-    recommended = max(career_scores.items(), key=lambda x: x[1])
-    recommended_path = recommended[0]
+    if max(scores.values()) == 0:
+        return {"category": "algorithms", "confidence": 0.3}
     
-    max_prob = max(probabilities.values())
-    confidence = min(0.95, max_prob * 1.5)
+    best_category = max(scores.items(), key=lambda x: x[1])
+    total = sum(scores.values())
+    confidence = best_category[1] / total if total > 0 else 0.3
     
     return {
-        "recommended_path": recommended_path,
-        "probabilities": probabilities,
-        "confidence": confidence
+        "category": best_category[0],
+        "confidence": min(0.95, confidence)
     }
 
-def classify_question(data):
-    """Classify a question into a category using ML model"""
+def classify_texts(texts):
+    """Classify many question texts with one vectorizer transform and one predict_proba"""
     models = load_models()
-    text = data.get("text", "")
     
-    if models and "question_classifier" in models and "question_vectorizer" in models:
+    if texts and models and "question_classifier" in models and "question_vectorizer" in models:
         try:
-            vectorizer = models["question_vectorizer"]
             classifier = models["question_classifier"]
             label_encoder = models.get("question_label_encoder")
             
-            text_vector = vectorizer.transform([text])
-            prediction = classifier.predict(text_vector)[0]
-            prediction_proba = classifier.predict_proba(text_vector)[0]
-            confidence = float(np.max(prediction_proba))
+            text_vectors = models["question_vectorizer"].transform(texts)
+            prediction_proba = classifier.predict_proba(text_vectors)
+            predictions = classifier.classes_[np.argmax(prediction_proba, axis=1)]
+            confidences = np.max(prediction_proba, axis=1)
             
             if label_encoder:
-                category = label_encoder.inverse_transform([prediction])[0]
+                categories = label_encoder.inverse_transform(predictions)
             else:
-                category = str(prediction)
+                categories = [str(p) for p in predictions]
             
-            return {
-                "category": category,
-                "confidence": min(0.95, confidence)
-            }
+            return [
+                {"category": str(category), "confidence": min(0.95, float(confidence))}
+                for category, confidence in zip(categories, confidences)
+            ]
         except Exception as e:
             print(f"ML classification failed: {e}", file=sys.stderr)
     
-    keywords = {
-        "frontend": ["css", "html", "react", "vue", "angular", "dom", "ui", "ux", "style", "component", "javascript", "browser"],
-        "backend": ["api", "server", "database", "rest", "http", "node", "express", "endpoint", "request", "response", "middleware"],
-        "data": ["sql", "query", "table", "schema", "index", "normalization", "data", "analytics", "pandas", "numpy"],
-        "algorithms": ["complexity", "sort", "search", "tree", "graph", "recursion", "dynamic", "hash", "array", "linked"],
-        "security": ["xss", "sql injection", "csrf", "authentication", "authorization", "encryption", "https", "cors", "vulnerability"]
-    }
-    
-    text_lower = text.lower()
-    
-    scores = {}
-    for category, words in keywords.items():
-        score = sum(1 for word in words if word in text_lower)
-        scores[category] = score
-    
-    if max(scores.values()) == 0:
-        return {"category": "algorithms", "confidence": 0.3}
-    
-    best_category = max(scores.items(), key=lambda x: x[1])
-    total = sum(scores.values())
-    confidence = best_category[1] / total if total > 0 else 0.3
-    
-    return {
-        "category": best_category[0],
-        "confidence": min(0.95, confidence)
-    }
+    return [classify_by_keywords(text) for text in texts]
+
+def classify_question(data):
+    """Classify a question into a category using ML model"""
+    return classify_texts([data.get("text", "")])[0]
+
+def iter_classify_texts(texts, chunk_size=CLASSIFY_CHUNK_SIZE):
+    """Yield classifications for any iterable of texts, one chunk-sized batch at a time"""
+    texts = iter(texts)
+    while True:
+        chunk = list(islice(texts, chunk_size))
+        if not chunk:
+            return
+        for text in chunk:
+            if not isinstance(text, str):
+                raise ValueError(f"texts must be strings (got {type(text).__name__})")
+        yield from classify_texts(chunk)
+
+def classify_questions(data):
+    """Classify a list of question texts in batched vectorizer/classifier calls"""
+    texts = data.get("texts", [])
+    if not isinstance(texts, list):
+        raise ValueError("texts must be a list of strings")
+    chunk_size = int(data.get("chunk_size") or CLASSIFY_CHUNK_SIZE)
+    return list(iter_classify_texts(texts, chunk_size))
+
+def get_questions(data):
+    """Look up bank questions by content id; unknown ids map to None"""
+    ids = data.get("ids", [])
+    if not isinstance(ids, list):
+        raise ValueError("ids must be a list of question ids")
+    store = get_question_bank().store
+    return [store.get(question_id) for question_id in ids]
 
 def health_check(data):
-    """Check if the ML service is healthy"""
+    """Check if the ML service is healthy (reports availability without loading models)"""
     models = load_models()
-    model_count = len(models)
     
     ml_models_available = []
     if "question_classifier" in models:
@@ -1152,55 +810,238 @@ def health_check(data):
     
     return {
         "status": "healthy",
-        "models_loaded": model_count,
+        "models_loaded": len(models.loaded()),
+        "models_available": len(models),
+        "loaded_models": models.loaded(),
         "ml_models_available": ml_models_available,
-        "question_bank_size": len(QUESTION_BANK),
-        "using_ml": len(ml_models_available) > 0
+        "question_bank_size": len(get_question_bank()),
+        "question_bank": QUESTION_BANK_SOURCE.stats(),
+        "using_ml": len(ml_models_available) > 0,
+        "response_cache": RESPONSE_CACHE.stats() if RESPONSE_CACHE is not None else None,
+        "quiz_pool": QUIZ_POOL.stats() if QUIZ_POOL is not None else None,
+        "startup_profile": get_report()
     }
 
+HANDLERS = {
+    "generate_quiz": generate_quiz,
+    "suggest_study": suggest_study,
+    "recommend_career": recommend_career,
+    "classify_question": classify_question,
+    "classify_questions": classify_questions,
+    "get_questions": get_questions,
+    "health_check": health_check,
+    # LLM prompt guidance / validation from hybrid_generator, served on warm models
+    **HYBRID_HANDLERS
+}
+
+# Commands whose result is a pure function of their input (and the saved models);
+# generate_quiz joins them when the request carries a seed
+CACHEABLE_COMMANDS = {"recommend_career", "classify_question", "suggest_study"}
+
+RESPONSE_CACHE = ResponseCache(SAVED_MODELS_DIR) if CACHE_ENABLED else None
+
+def is_cacheable(command, data):
+    if RESPONSE_CACHE is None:
+        return False
+    if command == "generate_quiz":
+        # Only seeded quizzes are reproducible
+        return isinstance(data, dict) and data.get("seed") is not None
+    return command in CACHEABLE_COMMANDS
+
+# Commands whose result also depends on the question bank file
+BANK_DEPENDENT_COMMANDS = {"generate_quiz", "get_questions"}
+
+def cache_key_data(command, data):
+    """Request data as keyed in the cache; bank-dependent results are keyed on the bank version too"""
+    if command in BANK_DEPENDENT_COMMANDS:
+        return {"data": data, "question_bank": get_question_bank().version}
+    return data
+
+def cache_lookup(command, data):
+    """Return (True, result) when a cached response exists, else (False, None)"""
+    if not is_cacheable(command, data):
+        return False, None
+    return RESPONSE_CACHE.get(command, cache_key_data(command, data))
+
+def cache_store(command, data, result):
+    if is_cacheable(command, data):
+        RESPONSE_CACHE.set(command, cache_key_data(command, data), result)
+
+# Unseeded quizzes for hot parameter combinations are pre-generated in the background
+QUIZ_POOL = QuizPool(generate_quiz) if QUIZ_POOL_ENABLED else None
+
+def pool_lookup(command, data):
+    """Return a pre-generated quiz for a poolable generate_quiz request, else None"""
+    if QUIZ_POOL is None or command != "generate_quiz":
+        return None
+    return QUIZ_POOL.get(data)
+
+def run_command(command, data, compute=None):
+    """Run a handler (or `compute`), serving deterministic commands from the response cache
+    and unseeded quizzes from the quiz pool"""
+    hit, result = cache_lookup(command, data)
+    if hit:
+        return result
+    result = pool_lookup(command, data)
+    if result is not None:
+        return result
+    result = (compute or HANDLERS[command])(data)
+    cache_store(command, data, result)
+    return result
+
+def handle_request(request):
+    """Run a single {"command", "data"} request and return the response payload"""
+    if not isinstance(request, dict):
+        error_msg = "Request must be a JSON object"
+        log_prediction_request("unknown", {}, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    command = request.get("command")
+    data = request.get("data", {})
+    
+    if command not in HANDLERS:
+        error_msg = f"Unknown command: {command}"
+        log_prediction_request(command, data, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    try:
+        result = run_command(command, data)
+    except Exception as e:
+        error_msg = str(e)
+        log_prediction_request(command, data, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    # Log the request with result
+    log_prediction_request(command, data, result=result)
+    
+    return {"success": True, "result": result}
+
+def classify_batch_item(data):
+    """Extract the classify_question text a batched run will classify"""
+    text = data.get("text", "")
+    if not isinstance(text, str):
+        raise ValueError("text must be a string")
+    return text
+
+def career_batch_item(data):
+    """Validate a recommend_career profile before it joins a batched run"""
+    try:
+        build_career_profile_matrix([data])
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid assessment profile: {e}")
+    return data
+
+# Commands with a vectorized implementation: command -> (item extractor, batch function)
+BATCH_COMMANDS = {
+    "classify_question": (classify_batch_item, classify_texts),
+    "recommend_career": (career_batch_item, recommend_careers),
+}
+
+def run_batch(requests):
+    """Run a list of {"command", "data"} requests in one pass, returning responses in request order.
+    
+    classify_question texts go through a single vectorizer transform and
+    recommend_career profiles through a single matrix computation; every other
+    command is dispatched through handle_request. Failures are reported per item.
+    """
+    responses = [None] * len(requests)
+    grouped = {command: [] for command in BATCH_COMMANDS}
+    
+    for i, request in enumerate(requests):
+        command = request.get("command") if isinstance(request, dict) else None
+        data = request.get("data", {}) if isinstance(request, dict) else None
+        
+        if command in BATCH_COMMANDS and isinstance(data, dict):
+            hit, result = cache_lookup(command, data)
+            if hit:
+                responses[i] = {"success": True, "result": result}
+                continue
+            extract, _ = BATCH_COMMANDS[command]
+            try:
+                grouped[command].append((i, data, extract(data)))
+            except ValueError as e:
+                responses[i] = {"success": False, "error": str(e)}
+        else:
+            responses[i] = handle_request(request)
+    
+    for command, items in grouped.items():
+        if not items:
+            continue
+        _, batch_fn = BATCH_COMMANDS[command]
+        try:
+            results = batch_fn([item for _, _, item in items])
+        except Exception as e:
+            for i, _, _ in items:
+                responses[i] = {"success": False, "error": str(e)}
+        else:
+            for (i, data, _), result in zip(items, results):
+                cache_store(command, data, result)
+                responses[i] = {"success": True, "result": result}
+    
+    return responses
+
+def serve_stdin():
+    """Persistent worker: read newline-delimited JSON requests, write one JSON response per line.
+    
+    Models are loaded once up front. A request may carry an "id", which is echoed
+    back so callers can pipeline several requests on one process.
+    """
+    load_models()
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            error_msg = f"Invalid JSON: {str(e)}"
+            log_prediction_request("unknown", {}, error=error_msg)
+            response = {"success": False, "error": error_msg}
+        else:
+            response = handle_request(request)
+            if isinstance(request, dict) and "id" in request:
+                response["id"] = request["id"]
+        
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({"success": False, "error": "No command provided"}))
         sys.exit(1)
     
+    if sys.argv[1] == "--serve":
+        serve_stdin()
+        return
+    
+    if sys.argv[1] == "--export-mmap":
+        written = export_mmap(SAVED_MODELS_DIR, MODEL_FILES)
+        print(json.dumps({"success": True, "result": [path.name for path in written]}))
+        return
+    
+    if sys.argv[1] == "--profile-startup":
+        # Force every cold-start cost so each phase shows up in the report
+        load_models(warm=["all"])
+        get_question_columns()
+        get_near_duplicate_index()
+        report = get_report()
+        print(format_report(report), file=sys.stderr)
+        print(json.dumps(report))
+        return
+    
     try:
         request = json.loads(sys.argv[1])
-        command = request.get("command")
-        data = request.get("data", {})
-        
-        handlers = {
-            "generate_quiz": generate_quiz,
-            "suggest_study": suggest_study,
-            "recommend_career": recommend_career,
-            "classify_question": classify_question,
-            "health_check": health_check
-        }
-        
-        if command not in handlers:
-            error_msg = f"Unknown command: {command}"
-            log_prediction_request(command, data, error=error_msg)
-            print(json.dumps({"success": False, "error": error_msg}))
-            sys.exit(1)
-        
-        # Execute handler
-        result = handlers[command](data)
-        
-        # Log the request with result
-        log_prediction_request(command, data, result=result)
-        
-        print(json.dumps({"success": True, "result": result}))
-        
     except json.JSONDecodeError as e:
         error_msg = f"Invalid JSON: {str(e)}"
         log_prediction_request("unknown", {}, error=error_msg)
         print(json.dumps({"success": False, "error": error_msg}))
         sys.exit(1)
-    except Exception as e:
-        error_msg = str(e)
-        log_prediction_request(request.get("command", "unknown") if 'request' in locals() else "unknown", 
-                             request.get("data", {}) if 'request' in locals() else {}, 
-                             error=error_msg)
-        print(json.dumps({"success": False, "error": error_msg}))
+    
+    response = handle_request(request)
+    print(json.dumps(response))
+    if not response["success"]:
         sys.exit(1)
 
 if __name__ == "__main__":
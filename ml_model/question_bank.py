@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+File-backed question bank for CareerQuest ML services
+Questions live in a JSON-lines file (one question object per line). The file
+is streamed once: qids are checked, and content ids, the id -> record store
+and the inverted index are built record by record, so no second pass over the
+bank is needed.
+QuestionBankSource reloads the bank when the file changes on disk and owns
+the bank's near-duplicate index.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+from near_duplicate import build_near_duplicate_index
+from question_index import QuestionIndexBuilder
+from question_store import question_id, store_question
+from startup_profiler import profile_phase
+
+QUESTION_BANK_PATH = Path(os.environ.get("ML_QUESTION_BANK", Path(__file__).parent / "question_bank.jsonl"))
+
+# How often (seconds) the bank file is re-stat'ed for changes
+RELOAD_CHECK_INTERVAL = 1.0
+
+REQUIRED_FIELDS = ("qid", "question", "options", "correctAnswer", "category", "difficulty", "explanation")
+
+
+def iter_question_records(path):
+    """Yield (line number, question dict) from a JSON-lines file, skipping blank and # comment lines"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+            missing = [field for field in REQUIRED_FIELDS if field not in record]
+            if missing:
+                raise ValueError(f"{path}:{line_number}: missing fields {missing}")
+            qid = record["qid"]
+            if not isinstance(qid, int) or isinstance(qid, bool) or qid < 0:
+                raise ValueError(f"{path}:{line_number}: qid must be a non-negative integer, got {qid!r}")
+            yield line_number, record
+
+
+def file_signature(path):
+    """(mtime_ns, size) of the bank file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class QuestionBank:
+    """One loaded snapshot of the bank; replaced wholesale on reload, never mutated."""
+
+    def __init__(self, questions, store, index, signature):
+        self.questions = questions
+        self.store = store
+        self.index = index
+        self.signature = signature
+        # Tag that changes whenever the file does; part of cache keys for bank-dependent results
+        self.version = f"{signature[0]}-{signature[1]}" if signature else "empty"
+        # Derived tables (e.g. scoring columns) cached by the caller for this snapshot
+        self.derived = {}
+
+    def __len__(self):
+        return len(self.questions)
+
+
+def load_question_bank(path=QUESTION_BANK_PATH, level_range_fn=None):
+    """Stream the bank file into a QuestionBank.
+
+    Each record carries an explicit qid, the key of users' seen-question
+    bitsets. It must never change or be reused, so lines can be reordered or
+    deleted safely; a new question takes an unused qid (e.g. the current
+    maximum + 1). Duplicate qids are rejected. Its id is derived from its text.
+    """
+    signature = file_signature(path)
+    questions = []
+    store = {}
+    qid_lines = {}
+    builder = QuestionIndexBuilder(level_range_fn)
+
+    for line_number, record in iter_question_records(path):
+        if record["qid"] in qid_lines:
+            raise ValueError(f"{path}:{line_number}: duplicate qid {record['qid']} (also on line {qid_lines[record['qid']]})")
+        qid_lines[record["qid"]] = line_number
+        record["id"] = question_id(record["question"])
+        store_question(store, record)
+        builder.add(record)
+        questions.append(record)
+
+    return QuestionBank(questions, store, builder.build(), signature)
+
+
+class QuestionBankSource:
+    """Lazily loads the bank and hot-reloads it when the file changes.
+
+    The file is stat'ed at most once every RELOAD_CHECK_INTERVAL seconds. A
+    reload builds a complete new snapshot before swapping it in, so readers
+    always see a consistent bank; if the new file fails to load, the previous
+    snapshot stays in service. `on_reload(bank)` runs after each swap.
+    Use shared_source() so every module in a process reads the same snapshot.
+    """
+
+    def __init__(self, path=QUESTION_BANK_PATH, level_range_fn=None, on_reload=None):
+        self.path = Path(path)
+        self.level_range_fn = level_range_fn
+        self.on_reload = on_reload
+        self.reloads = 0
+        self._bank = None
+        self._checked_at = 0.0
+        self._failed_signature = None
+        self._near_duplicates = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        bank = self._bank
+        now = time.monotonic()
+        if bank is not None and now - self._checked_at < RELOAD_CHECK_INTERVAL:
+            return bank
+
+        with self._lock:
+            self._checked_at = now
+            bank = self._bank
+            signature = file_signature(self.path)
+            if bank is not None and signature in (bank.signature, self._failed_signature):
+                return bank
+            try:
+                with profile_phase("question bank load", "data"):
+                    new_bank = load_question_bank(self.path, self.level_range_fn)
+            except (OSError, ValueError) as e:
+                if bank is None:
+                    raise
+                self._failed_signature = signature
+                print(f"Warning: Failed to reload question bank, keeping previous version: {e}", file=sys.stderr)
+                return bank
+            self._bank = new_bank
+            if bank is not None:
+                self.reloads += 1
+                print(f"Question bank reloaded: {len(new_bank)} questions", file=sys.stderr)
+
+        if bank is not None and self.on_reload is not None:
+            self.on_reload(new_bank)
+        return new_bank
+
+    def near_duplicate_index(self, bank=None):
+        """MinHash/LSH near-duplicate index of a bank snapshot (the current one by default).
+
+        Built on first use and cached in the snapshot's derived tables. After a
+        reload only questions new to the bank are hashed; the rest reuse
+        signatures from the previous index.
+        """
+        bank = bank or self.get()
+        index = bank.derived.get("near_duplicates")
+        if index is None:
+            with profile_phase("near-duplicate index build", "data"):
+                index = build_near_duplicate_index(bank.questions, previous=self._near_duplicates)
+            bank.derived["near_duplicates"] = index
+            self._near_duplicates = index
+        return index
+
+    def stats(self):
+        bank = self._bank
+        return {
+            "path": str(self.path),
+            "loaded": bank is not None,
+            "size": len(bank) if bank is not None else 0,
+            "version": bank.version if bank is not None else None,
+            "reloads": self.reloads,
+        }
+
+
+_shared_sources = {}
+_shared_lock = threading.Lock()
+
+
+def shared_source(path=QUESTION_BANK_PATH, level_range_fn=None, on_reload=None):
+    """Process-wide source for a bank file.
+
+    prediction_service and hybrid_generator both call this, so in one process
+    the bank and its near-duplicate index are loaded once. Callbacks passed
+    here replace the source's current ones; set them before the first get().
+    """
+    key = Path(path).resolve()
+    with _shared_lock:
+        source = _shared_sources.get(key)
+        if source is None:
+            source = _shared_sources[key] = QuestionBankSource(path)
+        if level_range_fn is not None:
+            source.level_range_fn = level_range_fn
+        if on_reload is not None:
+            source.on_reload = on_reload
+    return source
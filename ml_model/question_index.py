@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Inverted index over question records for CareerQuest
+Maps category, difficulty and level bucket to positions in a question list
+(the question bank in question_bank.py, templates in hybrid_generator.py)
+"""
+
+import numpy as np
+
+LEVEL_BUCKET_SIZE = 5
+
+# (low, high, difficulty): the quiz difficulty a "medium" request targets at each user level band
+LEVEL_DIFFICULTY_BANDS = (
+    (1, 5, "easy"),
+    (6, 12, "medium"),
+    (13, 19, "medium"),
+    (20, 30, "hard"),
+)
+
+_EMPTY = np.array([], dtype=np.intp)
+
+
+def level_bucket(level):
+    """Bucket a user level into fixed-width level bands"""
+    return int(level) // LEVEL_BUCKET_SIZE
+
+
+def level_band(level):
+    """Index of the LEVEL_DIFFICULTY_BANDS entry containing level, or None"""
+    for band, (low, high, _) in enumerate(LEVEL_DIFFICULTY_BANDS):
+        if low <= level <= high:
+            return band
+    return None
+
+
+def effective_difficulty(difficulty, level):
+    """Difficulty a quiz request targets: "medium" follows the user's level band"""
+    if difficulty == "medium":
+        band = level_band(level)
+        if band is not None:
+            return LEVEL_DIFFICULTY_BANDS[band][2]
+    return difficulty
+
+
+class QuestionIndexBuilder:
+    """Accumulates posting lists one record at a time (e.g. while streaming a file).
+
+    `level_range_fn(difficulty)` supplies a level range for records without one;
+    records with no range at all are left out of the level buckets.
+    """
+
+    def __init__(self, level_range_fn=None):
+        self.level_range_fn = level_range_fn
+        self.count = 0
+        self._postings = {"category": {}, "difficulty": {}, "category_difficulty": {}, "level_bucket": {}}
+
+    def add(self, q):
+        """Index the next record; its position is the number of records added before it"""
+        i = self.count
+        self.count += 1
+
+        postings = self._postings
+        category = q.get("category")
+        difficulty = q.get("difficulty")
+        postings["category"].setdefault(category, []).append(i)
+        postings["difficulty"].setdefault(difficulty, []).append(i)
+        postings["category_difficulty"].setdefault((category, difficulty), []).append(i)
+
+        level_range = q.get("level_range")
+        if not level_range and self.level_range_fn:
+            level_range = self.level_range_fn(difficulty or "medium")
+        if level_range:
+            for bucket in range(level_bucket(level_range[0]), level_bucket(level_range[1]) + 1):
+                postings["level_bucket"].setdefault(bucket, []).append(i)
+
+    def build(self):
+        index = {
+            key: {value: np.array(positions, dtype=np.intp) for value, positions in table.items()}
+            for key, table in self._postings.items()
+        }
+        index["all"] = np.arange(self.count, dtype=np.intp)
+        return index
+
+
+def build_question_index(questions, level_range_fn=None):
+    """Build category / difficulty / level-bucket posting lists in one pass"""
+    builder = QuestionIndexBuilder(level_range_fn)
+    for q in questions:
+        builder.add(q)
+    return builder.build()
+
+
+def lookup_questions(index, category=None, difficulty=None, level=None):
+    """Return sorted positions matching every given filter (None means any)"""
+    if category is not None and difficulty is not None:
+        matches = index["category_difficulty"].get((category, difficulty), _EMPTY)
+    elif category is not None:
+        matches = index["category"].get(category, _EMPTY)
+    elif difficulty is not None:
+        matches = index["difficulty"].get(difficulty, _EMPTY)
+    else:
+        matches = index["all"]
+
+    if level is not None:
+        bucket = index["level_bucket"].get(level_bucket(level), _EMPTY)
+        matches = np.intersect1d(matches, bucket, assume_unique=True)
+
+    return matches
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Content-derived question ids for CareerQuest ML services
+A question's id is a hash of its normalized text, so the same question gets
+the same id in QUESTION_BANK, question_templates.json and every response,
+regardless of order or which file it came from
+"""
+
+import re
+import sys
+import hashlib
+
+# Ids fit in 53 bits so they survive a round trip through JSON / JavaScript numbers
+ID_BITS = 53
+ID_MASK = (1 << ID_BITS) - 1
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question_text(text):
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def question_id(text):
+    """Stable integer id of a question text"""
+    digest = hashlib.blake2b(normalize_question_text(text).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & ID_MASK
+
+
+def assign_question_ids(questions):
+    """Set questions' "id" from their text (in place); returns the list"""
+    for q in questions:
+        q["id"] = question_id(q.get("question", ""))
+    return questions
+
+
+def store_question(store, q):
+    """Add a record to an id -> question map for O(1) lookup; the first record wins on duplicate ids"""
+    question_id = q["id"]
+    if question_id in store:
+        print(f"Warning: duplicate question id {question_id}: {q.get('question', '')[:60]!r}", file=sys.stderr)
+        return
+    store[question_id] = q
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Pre-generated quiz pool for CareerQuest ML services
+Keeps ready-made quizzes for hot (category, difficulty, career_path, level
+bucket, count) combinations, serves them in O(1) and refills drained pools
+from a background thread. Per-key pool sizes follow observed demand.
+"""
+
+import os
+import sys
+import math
+import time
+import threading
+from collections import deque
+
+from question_index import effective_difficulty, level_band, level_bucket
+
+# Opt-in: ML_QUIZ_POOL=1 serves generate_quiz from the pool
+QUIZ_POOL_ENABLED = os.environ.get("ML_QUIZ_POOL", "0").lower() in ("1", "true", "yes")
+QUIZ_POOL_MIN_SIZE = int(os.environ.get("ML_QUIZ_POOL_MIN_SIZE", "2"))
+QUIZ_POOL_MAX_SIZE = int(os.environ.get("ML_QUIZ_POOL_MAX_SIZE", "32"))
+QUIZ_POOL_MAX_KEYS = int(os.environ.get("ML_QUIZ_POOL_MAX_KEYS", "64"))
+
+# Demand is a request count decayed with this time constant (seconds)
+DEMAND_TIME_CONSTANT = 60.0
+# Pools hold roughly this many seconds of observed demand
+REFILL_HORIZON_SECONDS = 10.0
+# Keys whose decayed demand drops below this stop being refilled
+COLD_DEMAND = 0.5
+
+# Only requests made of these fields map onto a pool key; anything else
+# (seed, exclusions, candidate_pool, ...) is generated on demand
+POOLABLE_FIELDS = {"category", "difficulty", "career_path", "level", "count"}
+
+
+class QuizPool:
+    """Per-key queues of pre-generated quizzes refilled in the background."""
+
+    def __init__(self, generate_fn, min_size=QUIZ_POOL_MIN_SIZE, max_size=QUIZ_POOL_MAX_SIZE, max_keys=QUIZ_POOL_MAX_KEYS):
+        self.generate_fn = generate_fn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_keys = max_keys
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self._pools = {}    # key -> deque of quizzes
+        self._params = {}   # key -> request data used to refill the pool
+        self._demand = {}   # key -> (decayed request count, last update time)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    @staticmethod
+    def key_for(data):
+        """Pool key for a request, or None when the request is not poolable.
+
+        Keys use the difficulty generate_quiz actually targets at the request's
+        level, and level buckets split at the level band edges, so every quiz
+        in a pool was generated for the same target difficulty and band.
+        """
+        if not isinstance(data, dict) or not set(data) <= POOLABLE_FIELDS:
+            return None
+        try:
+            level = data.get("level", 10)
+            return (
+                data.get("category", "mixed"),
+                effective_difficulty(data.get("difficulty", "medium"), level),
+                data.get("career_path", "fullstack"),
+                level_band(level),
+                level_bucket(level),
+                int(data.get("count", 5)),
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so (re)start the refiller in each worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._refill_loop, name="quiz-pool-refill", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _decayed_demand(self, key, now):
+        demand, updated = self._demand.get(key, (0.0, now))
+        return demand * math.exp(-(now - updated) / DEMAND_TIME_CONSTANT)
+
+    def target_size(self, key, now=None):
+        """Pool size for a key: about REFILL_HORIZON_SECONDS of its recent request rate"""
+        demand = self._decayed_demand(key, now or time.monotonic())
+        if demand < COLD_DEMAND:
+            return 0
+        rate = demand / DEMAND_TIME_CONSTANT
+        return max(self.min_size, min(self.max_size, math.ceil(rate * REFILL_HORIZON_SECONDS)))
+
+    def get(self, data):
+        """Pop a ready quiz for this request, or None on a miss (the caller generates one)"""
+        key = self.key_for(data)
+        if key is None:
+            return None
+
+        self._ensure_started()
+        now = time.monotonic()
+        with self._lock:
+            self._demand[key] = (self._decayed_demand(key, now) + 1.0, now)
+            self._params[key] = dict(data)
+            pool = self._pools.setdefault(key, deque())
+            self._evict_cold_keys(now)
+            quiz = pool.popleft() if pool else None
+            if quiz is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        self._wake.set()
+        return quiz
+
+    def _evict_cold_keys(self, now):
+        while len(self._pools) > self.max_keys:
+            coldest = min(self._pools, key=lambda k: self._decayed_demand(k, now))
+            for table in (self._pools, self._params, self._demand):
+                table.pop(coldest, None)
+
+    def _next_refill(self):
+        """Key furthest below its target size, with the params to refill it"""
+        now = time.monotonic()
+        with self._lock:
+            best, best_gap = None, 0
+            for key, pool in self._pools.items():
+                gap = self.target_size(key, now) - len(pool)
+                if gap > best_gap:
+                    best, best_gap = key, gap
+            return (best, self._params[best]) if best is not None else (None, None)
+
+    def _refill_loop(self):
+        while True:
+            key, params = self._next_refill()
+            if key is None:
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
+                continue
+            try:
+                quiz = self.generate_fn(dict(params))
+            except Exception as e:
+                print(f"Quiz pool refill failed for {key}: {e}", file=sys.stderr)
+                time.sleep(1.0)
+                continue
+            with self._lock:
+                if key in self._pools:
+                    self._pools[key].append(quiz)
+                    self.generated += 1
+
+    def clear(self):
+        """Drop every ready quiz (e.g. after the question bank changed); demand is kept"""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.clear()
+        self._wake.set()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "generated": self.generated,
+                "keys": [
+                    {
+                        "key": list(key),
+                        "ready": len(pool),
+                        "target": self.target_size(key, now),
+                        "demand": round(self._decayed_demand(key, now), 3),
+                    }
+                    for key, pool in self._pools.items()
+                ],
+            }
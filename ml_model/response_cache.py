@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Response cache for deterministic CareerQuest ML commands
+In-process LRU/TTL cache keyed on a canonical hash of (command, data), bounded
+in bytes, with an optional on-disk backend shared by workers on one host.
+Entries are invalidated automatically when files in saved_models/ change.
+The disk backend is pruned periodically: expired files (including those
+keyed under an old model fingerprint, which can never be hit again) are
+deleted, then the oldest files until the directory fits its byte budget.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+CACHE_ENABLED = os.environ.get("ML_CACHE", "1").lower() not in ("0", "false", "no")
+CACHE_MAX_BYTES = int(os.environ.get("ML_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.environ.get("ML_CACHE_TTL", "600"))
+CACHE_DIR = os.environ.get("ML_CACHE_DIR")
+CACHE_DISK_MAX_BYTES = int(os.environ.get("ML_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# How often (seconds) each process prunes the disk backend
+DISK_PRUNE_INTERVAL = 60.0
+
+# How often (seconds) the model directory is re-stat'ed for changes
+FINGERPRINT_CHECK_INTERVAL = 1.0
+
+
+def canonical_json(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def directory_fingerprint(directory):
+    """Hash of (name, size, mtime) for every file in a directory"""
+    digest = hashlib.sha1()
+    try:
+        entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return "missing"
+    for entry in entries:
+        if entry.is_file():
+            stat = entry.stat()
+            digest.update(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache of JSON-serializable command results."""
+
+    def __init__(self, watch_dir, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS, disk_dir=CACHE_DIR,
+                 disk_max_bytes=CACHE_DISK_MAX_BYTES):
+        self.watch_dir = watch_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._pruned_at = 0.0
+        self._prune_lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, serialized result)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._fingerprint = directory_fingerprint(watch_dir)
+        self._checked_at = time.monotonic()
+        self.counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                         "disk_pruned": 0}
+
+    def _current_fingerprint(self):
+        now = time.monotonic()
+        if now - self._checked_at >= FINGERPRINT_CHECK_INTERVAL:
+            self._checked_at = now
+            fingerprint = directory_fingerprint(self.watch_dir)
+            if fingerprint != self._fingerprint:
+                with self._lock:
+                    self._entries.clear()
+                    self._bytes = 0
+                    self.counters["invalidations"] += 1
+                self._fingerprint = fingerprint
+        return self._fingerprint
+
+    def key(self, command, data):
+        """Canonical hash of (command, data) under the current model fingerprint"""
+        payload = canonical_json([command, data, self._current_fingerprint()])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, command, data):
+        """Return (True, result) on a hit, (False, None) on a miss"""
+        key = self.key(command, data)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, serialized = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return True, json.loads(serialized)
+                self._remove(key)
+                self.counters["expirations"] += 1
+
+        serialized = self._disk_get(key, now)
+        if serialized is not None:
+            self._store(key, serialized, now + self.ttl)
+            with self._lock:
+                self.counters["hits"] += 1
+                self.counters["disk_hits"] += 1
+            return True, json.loads(serialized)
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return False, None
+
+    def set(self, command, data, result):
+        key = self.key(command, data)
+        serialized = canonical_json(result)
+        expires_at = time.time() + self.ttl
+        self._store(key, serialized, expires_at)
+        self._disk_set(key, serialized, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+                "disk_max_bytes": self.disk_max_bytes if self.disk_dir else None,
+                "model_fingerprint": self._fingerprint,
+            }
+
+    def _store(self, key, serialized, expires_at):
+        size = len(serialized)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, serialized)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters["evictions"] += 1
+
+    def _remove(self, key):
+        _, serialized = self._entries.pop(key)
+        self._bytes -= len(serialized)
+
+    def _disk_path(self, key):
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key, now):
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= now:
+            self._disk_unlink(path)
+            return None
+        return entry.get("result")
+
+    def _disk_set(self, key, serialized, expires_at):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent workers never read a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"expires_at": expires_at, "result": serialized}, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        self._maybe_prune_disk()
+
+    def _disk_unlink(self, path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _maybe_prune_disk(self):
+        now = time.monotonic()
+        if now - self._pruned_at < DISK_PRUNE_INTERVAL or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._pruned_at = now
+            self.prune_disk()
+        finally:
+            self._prune_lock.release()
+
+    def prune_disk(self):
+        """Delete expired disk entries, then the oldest ones until the directory fits disk_max_bytes.
+
+        An entry expires ttl seconds after it is written, so expiry is judged
+        from the file mtime without opening files. Returns the number of files
+        deleted.
+        """
+        if self.disk_dir is None:
+            return 0
+        now = time.time()
+        kept = []
+        removed = 0
+        for path in self.disk_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_mtime + self.ttl <= now:
+                self._disk_unlink(path)
+                removed += 1
+            else:
+                kept.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in kept)
+        kept.sort()
+        for _, size, path in kept:
+            if total <= self.disk_max_bytes:
+                break
+            self._disk_unlink(path)
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self.counters["disk_pruned"] += removed
+        return removed
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Seen-question filters for CareerQuest quiz generation
+Decodes a user's answered-question history, shipped either as a base64 bitset
+indexed by question qid or as a base64 Bloom filter over qids, into a boolean
+mask over bank positions so exclusion is a single vectorized operation.
+
+Bitset: bit `qid` set means seen. Byte `qid // 8`, bit `qid % 8`
+(least significant bit first).
+
+Bloom filter: {"bits": <base64>, "hashes": k}. With m = 8 * len(bits), a qid
+sets bits (h1 + i * h2) mod 2**64 mod m for i in 0..k-1, where h1 and h2 are
+the little-endian first and second 8 bytes of blake2b(str(qid), digest_size=16)
+and h2 has its lowest bit forced to 1.
+"""
+
+import base64
+import hashlib
+
+import numpy as np
+
+
+def decode_bits(encoded):
+    """Base64 string -> uint8 array of bits (LSB first within each byte)"""
+    try:
+        raw = base64.b64decode(encoded, validate=True)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid base64 bit array: {e}")
+    return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")
+
+
+def encode_bitset(qids):
+    """Encode an iterable of qids as a base64 bitset"""
+    qids = np.fromiter(qids, dtype=np.int64)
+    bits = np.zeros(int(qids.max()) + 1 if len(qids) else 0, dtype=np.uint8)
+    bits[qids] = 1
+    return base64.b64encode(np.packbits(bits, bitorder="little").tobytes()).decode()
+
+
+def bloom_hashes(qids):
+    """(h1, h2) uint64 arrays for the Bloom filter double-hashing scheme"""
+    digests = b"".join(hashlib.blake2b(str(int(qid)).encode(), digest_size=16).digest() for qid in qids)
+    pairs = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+    return pairs[:, 0].copy(), pairs[:, 1] | np.uint64(1)
+
+
+def bloom_positions(h1, h2, num_bits, num_hashes):
+    """Bit positions of each key: array of shape (len(h1), num_hashes)"""
+    steps = np.arange(num_hashes, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        combined = h1[:, None] + steps[None, :] * h2[:, None]
+    return combined % np.uint64(num_bits)
+
+
+def encode_bloom(qids, num_bits=8192, num_hashes=4):
+    """Build a Bloom filter over qids in the wire format generate_quiz accepts"""
+    num_bits = max(8, (num_bits + 7) // 8 * 8)
+    bits = np.zeros(num_bits, dtype=np.uint8)
+    h1, h2 = bloom_hashes(list(qids))
+    bits[bloom_positions(h1, h2, num_bits, num_hashes).ravel().astype(np.intp)] = 1
+    return {"bits": base64.b64encode(np.packbits(bits, bitorder="little").tobytes()).decode(), "hashes": num_hashes}
+
+
+def seen_mask(data, qids, bloom_keys=None):
+    """Boolean mask over `qids` of questions the request marks as seen, or None.
+
+    `bloom_keys` may pass precomputed bloom_hashes(qids) to skip rehashing.
+    """
+    bitset = data.get("seen")
+    bloom = data.get("seen_bloom")
+    if not bitset and not bloom:
+        return None
+
+    mask = np.zeros(len(qids), dtype=bool)
+
+    if bitset:
+        bits = decode_bits(bitset)
+        covered = qids < len(bits)
+        mask[covered] = bits[qids[covered]].astype(bool)
+
+    if bloom:
+        if not isinstance(bloom, dict):
+            raise ValueError("seen_bloom must be an object with 'bits' and 'hashes'")
+        bits = decode_bits(bloom.get("bits", ""))
+        num_hashes = int(bloom.get("hashes", 0))
+        if len(bits) == 0 or num_hashes <= 0:
+            raise ValueError("seen_bloom needs a non-empty 'bits' array and 'hashes' > 0")
+        h1, h2 = bloom_keys if bloom_keys is not None else bloom_hashes(qids)
+        positions = bloom_positions(h1, h2, len(bits), num_hashes).astype(np.intp)
+        mask |= bits[positions].all(axis=1)
+
+    return mask
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Startup profiler for CareerQuest ML services
+Records wall time and resident memory (RSS) delta for each startup phase:
+library imports, question bank construction and every model file load.
+A phase that runs again later (a model or bank reload) is kept separately
+in a bounded list of recent reloads, so the startup report stays fixed-size
+in long-running services.
+
+Phases may nest (e.g. "import prediction_service" contains "import numpy").
+Each entry keeps its inclusive wall time and RSS delta, plus `self_ms` and
+`self_rss_bytes` with nested phases subtracted; per-kind totals add up the
+self values, so nested work is counted once.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Most recent repeated (reload) phases kept for the report
+RELOAD_HISTORY = 50
+
+_phases = []
+_phase_names = set()
+_reloads = deque(maxlen=RELOAD_HISTORY)
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _stack():
+    """Phases currently open in this thread, innermost last"""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current_rss():
+    """Current resident set size in bytes, or None when it cannot be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def begin_phase(name, kind="phase"):
+    """Start timing a phase that cannot be wrapped in a `with` block"""
+    token = {"name": name, "kind": kind, "start": time.perf_counter(), "rss_start": current_rss(), "child_s": 0.0, "child_rss": 0}
+    _stack().append(token)
+    return token
+
+
+def end_phase(token):
+    """Finish a phase started with begin_phase and record it"""
+    elapsed = time.perf_counter() - token["start"]
+    rss_end = current_rss()
+    rss_delta = rss_end - token["rss_start"] if rss_end is not None and token["rss_start"] is not None else None
+    entry = {
+        "name": token["name"],
+        "kind": token["kind"],
+        "wall_ms": round(elapsed * 1000, 3),
+        "self_ms": round((elapsed - token["child_s"]) * 1000, 3),
+        "rss_delta_bytes": rss_delta,
+        "self_rss_bytes": rss_delta - token["child_rss"] if rss_delta is not None else None,
+    }
+
+    stack = _stack()
+    if token in stack:
+        stack.remove(token)
+    if stack:
+        parent = stack[-1]
+        parent["child_s"] += elapsed
+        parent["child_rss"] += rss_delta or 0
+
+    with _lock:
+        if entry["name"] in _phase_names:
+            _reloads.append(entry)
+        else:
+            _phase_names.add(entry["name"])
+            _phases.append(entry)
+    return entry
+
+
+@contextmanager
+def profile_phase(name, kind="phase"):
+    """Record wall time and RSS delta of the wrapped block"""
+    token = begin_phase(name, kind)
+    try:
+        yield
+    finally:
+        end_phase(token)
+
+
+def get_report():
+    """Snapshot of the startup phases with per-kind totals of self time, plus recent reloads"""
+    with _lock:
+        phases = list(_phases)
+        reloads = list(_reloads)
+
+    totals = {}
+    for entry in phases:
+        total = totals.setdefault(entry["kind"], {"wall_ms": 0.0, "rss_delta_bytes": 0})
+        total["wall_ms"] = round(total["wall_ms"] + entry["self_ms"], 3)
+        total["rss_delta_bytes"] += entry["self_rss_bytes"] or 0
+
+    return {
+        "phases": phases,
+        "totals": totals,
+        "reloads": reloads,
+        "rss_bytes": current_rss(),
+    }
+
+
+def format_report(report):
+    """Human-readable table of a get_report() snapshot"""
+    lines = [f"{'Phase':<44} {'Kind':<8} {'Wall (ms)':>10} {'Self (ms)':>10} {'RSS delta (KiB)':>16}"]
+    for entry in report["phases"]:
+        rss = entry["rss_delta_bytes"]
+        rss_text = f"{rss / 1024:.0f}" if rss is not None else "n/a"
+        lines.append(f"{entry['name']:<44} {entry['kind']:<8} {entry['wall_ms']:>10.1f} {entry['self_ms']:>10.1f} {rss_text:>16}")
+    for kind, total in report["totals"].items():
+        lines.append(f"{'total ' + kind:<44} {'':<8} {'':>10} {total['wall_ms']:>10.1f} {total['rss_delta_bytes'] / 1024:>16.0f}")
+    if report.get("reloads"):
+        lines.append(f"Reload phases since startup (most recent {RELOAD_HISTORY} kept): {len(report['reloads'])}")
+    if report["rss_bytes"] is not None:
+        lines.append(f"Resident memory: {report['rss_bytes'] / (1024 * 1024):.1f} MiB")
+    return "\n".join(lines)
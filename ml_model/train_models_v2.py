@@ -14,6 +14,7 @@ from sklearn.model_selection import train_test_split
 import sys
 sys.path.append(str(Path(__file__).parent))
 from question_dataset import QUESTION_DATASET, get_feature_matrix
+from question_store import assign_question_ids
 
 SAVED_MODELS_DIR = Path("ml_model/saved_models")
 SAVED_MODELS_DIR.mkdir(exist_ok=True)
@@ -150,7 +151,8 @@ with open(SAVED_MODELS_DIR / "question_pattern_model.pkl", "wb") as f:
     pickle.dump(pattern_model, f)
 print("  ✓ Saved: question_pattern_model.pkl")
 
-# Save question templates for generation
+# Save question templates for generation (with content-derived ids)
+assign_question_ids(QUESTION_DATASET)
 templates = {
     "questions": QUESTION_DATASET,
     "feature_names": ["word_count", "complexity_score", "abstraction_level", "num_options", "explanation_length"]
@@ -10,6 +10,8 @@ export interface GeneratedQuestion {
   category: string;
   difficulty: "easy" | "medium" | "hard";
   explanation: string;
+  id?: number;
+  qid?: number;
 }
 
 export interface StudySuggestion {
@@ -47,7 +49,8 @@ function loadQuestionsFromMLDataset(): GeneratedQuestion[] {
           correctAnswer: q.correct_answer || q.correctAnswer || 0,
           category: q.category || "algorithms",
           difficulty: q.difficulty || "medium",
-          explanation: q.explanation || "No explanation provided"
+          explanation: q.explanation || "No explanation provided",
+          id: q.id
         }));
       }
     }
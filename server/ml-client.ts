@@ -41,6 +41,51 @@ export async function callMLService<T = any>(command: string, data?: any, timeou
 	}
 }
 
+export type MLBatchRequest = {
+	command: string;
+	data?: any;
+};
+
+/**
+ * Run several ML commands in one round trip via `/predict/batch`.
+ * `result` holds one MLResponse per request, in request order; a failed item
+ * does not fail the whole batch.
+ */
+export async function callMLBatch(requests: MLBatchRequest[], timeoutMs = 10_000): Promise<MLResponse<MLResponse[]>> {
+	const url = `${ML_BASE}/predict/batch`;
+	const controller = new AbortController();
+	const id = setTimeout(() => controller.abort(), timeoutMs);
+
+	try {
+		const resp = await fetch(url, {
+			method: "POST",
+			headers: { "Content-Type": "application/json" },
+			body: JSON.stringify({ requests }),
+			signal: controller.signal,
+		});
+
+		clearTimeout(id);
+
+		let payload: any;
+		try {
+			payload = await resp.json();
+		} catch (jsonErr) {
+			return { success: false, error: `Invalid JSON response: ${jsonErr}` };
+		}
+
+		if (!resp.ok || !payload?.success) {
+			return { success: false, error: `ML service error: ${resp.status} ${resp.statusText} - ${JSON.stringify(payload)}` };
+		}
+
+		return { success: true, result: payload.result };
+	} catch (err: any) {
+		if (err.name === 'AbortError') {
+			return { success: false, error: `Request timed out after ${timeoutMs}ms` };
+		}
+		return { success: false, error: String(err) };
+	}
+}
+
 export async function healthCheck(timeoutMs = 3000): Promise<boolean> {
 	const url = `${ML_BASE}/health`;
 	const controller = new AbortController();
@@ -6,6 +6,49 @@ Test script to verify ML service is working correctly
 
 import subprocess
 import json
+import queue
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, "ml_model")
+from seen_filter import encode_bitset, encode_bloom, seen_mask
+from prediction_service import run_batch
+
+# Seconds to wait for the worker's reply to one request
+TIMEOUT = 30
+
+# One warm worker for every test; models are loaded once instead of per call
+worker = subprocess.Popen(
+    ["python3", "ml_model/prediction_service.py", "--serve"],
+    stdin=subprocess.PIPE,
+    stdout=subprocess.PIPE,
+    stderr=subprocess.PIPE,
+    text=True
+)
+
+# Pipes are drained on background threads so a hung worker can't block readline()
+responses = queue.Queue()
+worker_log = []
+
+def _read_responses():
+    for line in worker.stdout:
+        responses.put(line)
+    responses.put("")  # EOF
+
+def _read_log():
+    for line in worker.stderr:
+        worker_log.append(line)
+
+threading.Thread(target=_read_responses, daemon=True).start()
+threading.Thread(target=_read_log, daemon=True).start()
+
+def print_worker_log(since=0):
+    """Print the worker's stderr written since log position `since`"""
+    output = "".join(worker_log[since:]).strip()
+    if output:
+        print(f"   Worker stderr:\n{output}")
 
 def test_ml_service(command, data):
     """Test the ML prediction service"""
@@ -14,22 +57,29 @@ def test_ml_service(command, data):
         "data": data
     })
     
+    log_start = len(worker_log)
     try:
-        result = subprocess.run(
-            ["python3", "ml_model/prediction_service.py", request],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        worker.stdin.write(request + "\n")
+        worker.stdin.flush()
+        line = responses.get(timeout=TIMEOUT)
         
-        if result.returncode != 0:
-            print(f"❌ Error: {result.stderr}")
+        if not line:
+            print(f"❌ Error: worker exited with code {worker.poll()}")
+            print_worker_log(log_start)
             return None
             
-        response = json.loads(result.stdout)
+        response = json.loads(line)
+        if not response.get("success"):
+            print(f"❌ Error: {response.get('error')}")
+            print_worker_log(log_start)
         return response
+    except queue.Empty:
+        print(f"❌ Error: no response within {TIMEOUT}s")
+        print_worker_log(log_start)
+        return None
     except Exception as e:
         print(f"❌ Exception: {e}")
+        print_worker_log(log_start)
         return None
 
 # Test 1: Health Check
@@ -139,6 +189,87 @@ if result and result.get("success"):
 else:
     print("❌ Question classification failed")
 
+# Test 6: Seen-question filters (client wire format)
+print("\n" + "=" * 60)
+print("TEST 6: Seen-Question Filter Round Trip")
+print("=" * 60)
+qids = np.arange(500)
+seen_qids = {0, 7, 8, 63, 64, 255, 256, 499}
+bitset_mask = seen_mask({"seen": encode_bitset(seen_qids)}, qids)
+bloom_mask = seen_mask({"seen_bloom": encode_bloom(seen_qids, num_bits=4096, num_hashes=4)}, qids)
+expected = np.isin(qids, sorted(seen_qids))
+if (bitset_mask == expected).all() and bloom_mask[expected].all() and bloom_mask[~expected].sum() <= 5:
+    print("✅ Bitset decodes exactly; Bloom filter has no false negatives")
+    print(f"   Bloom false positives: {int(bloom_mask[~expected].sum())} of {int((~expected).sum())}")
+else:
+    print("❌ Seen filter round trip failed")
+
+result = test_ml_service("generate_quiz", {"category": "frontend", "count": 5, "seed": 1})
+if result and result.get("success"):
+    excluded = {q["qid"] for q in result["result"]}
+    result = test_ml_service("generate_quiz", {"category": "frontend", "count": 5, "seed": 1, "seen": encode_bitset(excluded)})
+    if result and result.get("success") and not excluded & {q["qid"] for q in result["result"]}:
+        print("✅ generate_quiz excluded every seen question")
+    else:
+        print("❌ generate_quiz returned seen questions")
+else:
+    print("❌ Quiz generation failed")
+
+# Test 7: Batch validation with malformed LLM output
+print("\n" + "=" * 60)
+print("TEST 7: Validate Questions (malformed items in batch)")
+print("=" * 60)
+generated = {
+    "question": "What does the CSS box-sizing property control?",
+    "options": ["Layout width rules", "Font size", "Colors", "Z-index"],
+    "correctAnswer": 0,
+    "explanation": "It decides whether padding and border count toward an element's width."
+}
+batch = [generated, {**generated, "options": None}, {**generated, "question": None, "explanation": None}, None]
+result = test_ml_service("validate_questions", {"questions": batch, "category": "frontend", "difficulty": "easy"})
+expected_reasons = {1: {"wrong_option_count"}, 2: {"question_too_short", "explanation_too_short"}, 3: set()}
+if result and result.get("success") and result["result"]["total_count"] == len(batch):
+    validation = result["result"]
+    rejected = {entry["index"]: set(entry["reasons"]) for entry in validation["rejected"]}
+    missing = {
+        index: sorted(reasons - rejected[index]) if index in rejected else "not rejected"
+        for index, reasons in expected_reasons.items()
+        if index not in rejected or not reasons <= rejected[index]
+    }
+    if not missing:
+        print(f"✅ Rejected every malformed item ({validation['validated_count']} of {validation['total_count']} validated)")
+    else:
+        print(f"❌ Malformed items not rejected as expected: {missing}")
+    for index, reasons in sorted(rejected.items()):
+        print(f"   Rejected #{index}: {', '.join(sorted(reasons))}")
+else:
+    print("❌ Batch validation failed")
+
+# Test 8: Batch requests report results per item
+print("\n" + "=" * 60)
+print("TEST 8: Batch Predictions (item without data)")
+print("=" * 60)
+batch = [
+    {"command": "classify_question", "data": {"text": "What is the CSS box model?"}},
+    {"command": "classify_question"},
+    {"command": "recommend_career"},
+    {"command": "unknown_command", "data": {}},
+]
+try:
+    batch_responses = run_batch(batch)
+except Exception as e:
+    batch_responses = None
+    print(f"❌ Exception: {e}")
+if batch_responses is not None:
+    outcomes = [response["success"] for response in batch_responses]
+    if len(batch_responses) == len(batch) and outcomes == [True, True, True, False]:
+        print(f"✅ Batch returned {len(batch_responses)} per-item responses")
+    else:
+        print(f"❌ Unexpected batch outcomes: {outcomes}")
+
+worker.stdin.close()
+worker.wait(timeout=30)
+
 print("\n" + "=" * 60)
 print("TESTS COMPLETE")
 print("=" * 60)
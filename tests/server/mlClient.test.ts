@@ -51,6 +51,48 @@ async function callMLService<T = any>(
   }
 }
 
+async function callMLBatch(
+  requests: { command: string; data?: any }[],
+  timeoutMs = 10_000
+): Promise<MLResponse<MLResponse[]>> {
+  const url = `${ML_BASE}/predict/batch`;
+  const controller = new AbortController();
+  const id = setTimeout(() => controller.abort(), timeoutMs);
+
+  try {
+    const resp = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ requests }),
+      signal: controller.signal,
+    });
+
+    clearTimeout(id);
+
+    let payload: any;
+    try {
+      payload = await resp.json();
+    } catch (jsonErr) {
+      return { success: false, error: `Invalid JSON response: ${jsonErr}` };
+    }
+
+    if (!resp.ok || !payload?.success) {
+      return {
+        success: false,
+        error: `ML service error: ${resp.status} ${resp.statusText} - ${JSON.stringify(payload)}`,
+      };
+    }
+
+    return { success: true, result: payload.result };
+  } catch (err: any) {
+    clearTimeout(id);
+    if (err.name === 'AbortError') {
+      return { success: false, error: `Request timed out after ${timeoutMs}ms` };
+    }
+    return { success: false, error: String(err) };
+  }
+}
+
 describe('ML Client', () => {
   const originalFetch = global.fetch;
 
@@ -179,4 +221,65 @@ describe('ML Client', () => {
       );
     });
   });
+
+  describe('callMLBatch', () => {
+    it('should post all requests to the batch endpoint', async () => {
+      const mockFetch = vi.fn().mockResolvedValue({
+        ok: true,
+        json: () => Promise.resolve({ success: true, result: [] }),
+      });
+      global.fetch = mockFetch;
+
+      const requests = [
+        { command: 'classify_question', data: { text: 'What is React?' } },
+        { command: 'recommend_career', data: { visual_design: 4 } },
+      ];
+
+      const promise = callMLBatch(requests);
+      await vi.runAllTimersAsync();
+      await promise;
+
+      expect(mockFetch).toHaveBeenCalledWith(
+        expect.stringContaining('/predict/batch'),
+        expect.objectContaining({
+          method: 'POST',
+          body: JSON.stringify({ requests }),
+        })
+      );
+    });
+
+    it('should return per-item results in request order', async () => {
+      const items = [
+        { success: true, result: { category: 'frontend', confidence: 0.8 } },
+        { success: false, error: 'Unknown command: nope' },
+      ];
+      global.fetch = vi.fn().mockResolvedValue({
+        ok: true,
+        json: () => Promise.resolve({ success: true, result: items }),
+      });
+
+      const promise = callMLBatch([{ command: 'classify_question' }, { command: 'nope' }]);
+      await vi.runAllTimersAsync();
+      const result = await promise;
+
+      expect(result.success).toBe(true);
+      expect(result.result).toEqual(items);
+    });
+
+    it('should return error when the batch is rejected', async () => {
+      global.fetch = vi.fn().mockResolvedValue({
+        ok: false,
+        status: 400,
+        statusText: 'Bad Request',
+        json: () => Promise.resolve({ success: false, error: 'Expected requests' }),
+      });
+
+      const promise = callMLBatch([]);
+      await vi.runAllTimersAsync();
+      const result = await promise;
+
+      expect(result.success).toBe(false);
+      expect(result.error).toContain('400');
+    });
+  });
 });